@@ -0,0 +1 @@
+"""服务器、端口与资源层的负载测试和微基准，运行方式: python -m benchmarks.run"""
@@ -0,0 +1,39 @@
+import math
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+def time_calls(func: Callable[[], object], min_time: float = 0.5, min_calls: int = 5) -> Dict[str, float]:
+    """
+    重复调用函数直到达到最短时长和最少次数
+
+    Returns:
+        {"ops_per_sec": 每秒调用数, "mean_us": 平均耗时, "p99_us": 99分位耗时}
+    """
+    durations = []
+    start = time.perf_counter()
+    while len(durations) < min_calls or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - t0)
+    total = sum(durations)
+    return {
+        "ops_per_sec": len(durations) / total if total else 0.0,
+        "mean_us": statistics.mean(durations) * 1e6,
+        "p99_us": percentile(durations, 99) * 1e6,
+    }
+
+def write_file(path: str, size: int) -> None:
+    """写入指定大小的伪随机内容"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
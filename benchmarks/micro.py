@@ -0,0 +1,63 @@
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict
+from utils.logger import Logger, info
+from utils.port_manager import PortManager
+from utils.resource_manager import ResourceManager
+from .common import time_calls
+
+@contextmanager
+def _quiet_console():
+    """临时关闭控制台日志输出，避免输出干扰计时和报告"""
+    console = getattr(Logger._instance, "console_handler", None)
+    level = console.level if console else None
+    if console:
+        console.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        if console:
+            console.setLevel(level)
+
+def bench_port_manager(min_time: float) -> Dict[str, float]:
+    """PortManager.find_available_port：首个端口可用时的单次耗时"""
+    return time_calls(lambda: PortManager.find_available_port(18160, 1), min_time)
+
+def bench_resources(min_time: float) -> Dict[str, Dict[str, float]]:
+    """ResourceManager.load_pixmap / load_text"""
+    from PyQt6.QtGui import QImage, QColor
+    root = tempfile.mkdtemp(prefix="bench-res-")
+    try:
+        image_path = os.path.join(root, "icon.png")
+        image = QImage(512, 512, QImage.Format.Format_ARGB32)
+        image.fill(QColor(30, 120, 200))
+        image.save(image_path)
+        text_path = os.path.join(root, "qss.qss")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("QWidget { color: #333; }\n" * 2000)
+        missing_path = os.path.join(root, "missing.png")
+        with _quiet_console():
+            return {
+                "resource.load_pixmap": time_calls(lambda: ResourceManager.load_pixmap(image_path, 128, 128), min_time),
+                "resource.load_pixmap_missing": time_calls(lambda: ResourceManager.load_pixmap(missing_path, 128, 128), min_time),
+                "resource.load_text": time_calls(lambda: ResourceManager.load_text(text_path), min_time),
+            }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def bench_logger(min_time: float) -> Dict[str, Dict[str, float]]:
+    """Logger吞吐：写入文件的INFO日志，以及被级别过滤掉的DEBUG日志"""
+    with _quiet_console():
+        return {
+            "logger.info": time_calls(lambda: info("benchmark message %d", 42), min_time),
+            "logger.disabled": time_calls(lambda: Logger.get_logger().log(5, "filtered"), min_time),
+        }
+
+def run(min_time: float = 0.5) -> Dict[str, Dict[str, float]]:
+    results = {"port.find_available_port": bench_port_manager(min_time)}
+    results.update(bench_resources(min_time))
+    results.update(bench_logger(min_time))
+    return results
@@ -0,0 +1,121 @@
+"""
+负载测试与微基准入口
+
+    python -m benchmarks.run                   # 运行并与基准结果对比
+    python -m benchmarks.run --quick           # 缩短时长，快速检查
+    python -m benchmarks.run --save-baseline   # 将本次结果保存为新的基准
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# 离屏平台必须在创建QGuiApplication前设置，保证无显示环境可运行
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QGuiApplication
+from utils.logger import Logger
+from . import micro, server_load
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# 指标方向：越高越好的指标，其余按越低越好处理
+HIGHER_IS_BETTER = ("requests_per_sec", "mb_per_sec", "ops_per_sec")
+# 只展示变化、不判定退化的指标（尾延迟在共享机器上波动较大）
+UNGATED_METRICS = ("p99_ms", "p99_us")
+# 不参与对比的指标
+IGNORED_METRICS = ("errors",)
+
+def compare(results, baseline, tolerance: float):
+    """与基准对比，返回 (行输出列表, 退化项列表)"""
+    lines, regressions = [], []
+    for name, metrics in sorted(results.items()):
+        base_metrics = baseline.get(name, {})
+        for metric, value in sorted(metrics.items()):
+            base = base_metrics.get(metric)
+            if base is None or metric in IGNORED_METRICS or base == 0:
+                lines.append(f"{name:<34} {metric:<18} {value:>12.2f}")
+                continue
+            change = (value - base) / base
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > tolerance and metric not in UNGATED_METRICS else ""
+            lines.append(f"{name:<34} {metric:<18} {value:>12.2f} {base:>12.2f} {change:>+8.1%} {flag}")
+            if flag:
+                regressions.append(f"{name}.{metric}")
+    return lines, regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="服务器、端口与资源层基准测试")
+    parser.add_argument("--quick", action="store_true", help="缩短每项时长")
+    parser.add_argument("--concurrency", default="1,8,32", help="压测并发级别，逗号分隔")
+    parser.add_argument("--duration", type=float, default=3.0, help="每个并发级别的压测秒数")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基准结果文件")
+    parser.add_argument("--save-baseline", action="store_true", help="保存本次结果为基准")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的退化比例")
+    parser.add_argument("--output", help="将本次结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    # 日志写入临时文件，不污染工作目录
+    log_dir = tempfile.mkdtemp(prefix="bench-log-")
+    Logger(log_file=os.path.join(log_dir, "bench.log"))
+    Logger.set_level("WARNING")
+    # QPixmap需要应用实例，保留引用直到运行结束
+    _app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    duration = 1.0 if args.quick else args.duration
+    min_time = 0.2 if args.quick else 0.5
+    levels = tuple(int(level) for level in args.concurrency.split(","))
+
+    started = time.time()
+    results = server_load.run(levels, duration)
+    results.update(micro.run(min_time))
+
+    machine = {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    baseline, baseline_machine = {}, {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        baseline, baseline_machine = stored.get("results", {}), stored.get("machine", {})
+
+    lines, regressions = compare(results, baseline, args.tolerance)
+    print(f"{'benchmark':<34} {'metric':<18} {'current':>12} {'baseline':>12} {'change':>8}")
+    for line in lines:
+        print(line)
+    print(f"总耗时: {time.time() - started:.1f}s")
+    if baseline and (baseline_machine.get("host"), baseline_machine.get("cpus")) != (machine["host"], machine["cpus"]):
+        # 吞吐与CPU核数强相关，跨机器比较的结论不可靠
+        print(f"注意: 基准记录于 {baseline_machine.get('host', '未知主机')} "
+              f"({baseline_machine.get('cpus', '?')} CPU)，当前为 {machine['host']} ({machine['cpus']} CPU)")
+
+    report = {
+        "machine": machine,
+        "settings": {"concurrency": list(levels), "duration": duration, "min_time": min_time},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"基准已保存: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("未找到基准结果，使用 --save-baseline 生成")
+        return 0
+    if regressions:
+        print(f"性能退化 (> {args.tolerance:.0%}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
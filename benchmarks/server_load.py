@@ -0,0 +1,130 @@
+import http.client
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import os
+from typing import Dict, List
+from core.server import HTTPServerManager
+from utils.port_manager import PortManager
+from .common import percentile, write_file
+
+# 合成的 vue/dist：大量小分块、少量样式/入口和大媒体文件
+SMALL_CHUNKS = 300
+SMALL_CHUNK_SIZE = 4 * 1024
+ENTRY_FILES = 10
+ENTRY_FILE_SIZE = 120 * 1024
+MEDIA_FILES = 2
+MEDIA_FILE_SIZE = 8 * 1024 * 1024
+
+# 请求构成：小分块 / 入口文件 / 大媒体
+REQUEST_MIX = (("chunk", 0.90), ("entry", 0.09), ("media", 0.01))
+
+def build_synthetic_dist(root: str) -> Dict[str, List[str]]:
+    """生成合成的构建产物目录，返回各类资源的URL路径"""
+    paths = {"chunk": [], "entry": [], "media": []}
+    write_file(os.path.join(root, "index.html"), 1024)
+    for i in range(SMALL_CHUNKS):
+        name = f"assets/chunk-{i:04d}.js"
+        write_file(os.path.join(root, name), SMALL_CHUNK_SIZE)
+        paths["chunk"].append("/" + name)
+    for i in range(ENTRY_FILES):
+        name = f"assets/index-{i:02d}.css" if i % 2 else f"assets/index-{i:02d}.js"
+        write_file(os.path.join(root, name), ENTRY_FILE_SIZE)
+        paths["entry"].append("/" + name)
+    for i in range(MEDIA_FILES):
+        name = f"media/video-{i}.mp4"
+        write_file(os.path.join(root, name), MEDIA_FILE_SIZE)
+        paths["media"].append("/" + name)
+    return paths
+
+def _wait_until_listening(port: int, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f"基准服务器未在 {timeout}s 内启动")
+
+def _pick(paths: Dict[str, List[str]], rng: random.Random) -> str:
+    roll = rng.random()
+    for kind, weight in REQUEST_MIX:
+        if roll < weight:
+            return rng.choice(paths[kind])
+        roll -= weight
+    return rng.choice(paths["chunk"])
+
+def run_level(port: int, paths: Dict[str, List[str]], concurrency: int, duration: float) -> Dict[str, float]:
+    """以指定并发数持续压测，返回吞吐与延迟百分位"""
+    latencies: List[float] = []
+    stats = {"errors": 0, "bytes": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        local, errors, received = [], 0, 0
+        while time.perf_counter() < deadline:
+            path = _pick(paths, rng)
+            t0 = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                body = resp.read()
+                conn.close()
+                if resp.status != 200:
+                    # 错误响应不计入吞吐字节数和延迟
+                    errors += 1
+                    continue
+                received += len(body)
+            except OSError:
+                errors += 1
+                continue
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+            stats["errors"] += errors
+            stats["bytes"] += received
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mb_per_sec": stats["bytes"] / elapsed / (1024 * 1024),
+        "errors": float(stats["errors"]),
+    }
+
+def run(concurrency_levels=(1, 8, 32), duration: float = 3.0, workers: int = 8) -> Dict[str, Dict[str, float]]:
+    """在合成目录上启动 HTTPServerManager 并逐级压测"""
+    root = tempfile.mkdtemp(prefix="bench-dist-")
+    manager = None
+    try:
+        paths = build_synthetic_dist(root)
+        port = PortManager.find_available_port(18060)
+        if not port:
+            raise RuntimeError("无法找到可用端口")
+        manager = HTTPServerManager(port, root, max_workers=workers, request_queue=128)
+        manager.start()
+        _wait_until_listening(port)
+        results = {}
+        for level in concurrency_levels:
+            results[f"server.c{level}"] = run_level(port, paths, level, duration)
+        return results
+    finally:
+        if manager:
+            manager.stop()
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,308 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 性能配置默认值（最低优先级）
+PROFILE_DEFAULTS: Dict[str, Any] = {
+    # 日志
+    "log_level": "INFO",
+    # 内嵌HTTP服务器
+    "server_workers": 8,
+    "server_request_queue": 32,
+    # WebEngine缓存
+    "http_cache_mb": 64,
+    # Chromium进程与GPU
+    "renderer_process_limit": 0,
+    "raster_threads": 0,
+    "disable_gpu": False,
+    "low_end_device_mode": False,
+    "extra_chromium_flags": "",
+    # 多窗口模式：启动时打开的窗口数
+    "window_count": 1,
+    # 页面生命周期：隐藏且空闲多久后冻结/丢弃（0为禁用），冻结时渲染进程内存超限即丢弃
+    "lifecycle_freeze_after_s": 30.0,
+    "lifecycle_discard_after_s": 900.0,
+    "lifecycle_discard_rss_mb": 0,
+    "lifecycle_check_interval_s": 5.0,
+    # 缓存代理：路径前缀 -> 上游地址（空为禁用），新鲜期与过期后可先返回旧响应的时长
+    "proxy_routes": {},
+    "proxy_ttl_s": 30.0,
+    "proxy_swr_s": 86400.0,
+    "proxy_cache_mb": 128,
+    "proxy_cache_path": "",
+    "proxy_pool_size": 8,
+    "proxy_timeout_s": 10.0,
+    # 可缓存的只读POST路径前缀（其余POST一律直接转发）
+    "proxy_cacheable_posts": [],
+    # Content-Length超过此值的响应不读入内存，流式转发且不缓存
+    "proxy_max_buffer_mb": 8,
+    # 下载管理：保存目录（空为系统下载目录）、并发数、进度信号频率
+    "download_dir": "",
+    "download_max_concurrent": 3,
+    "download_progress_hz": 60.0,
+    # 关键资源预加载：入口页面附带Link头、启动时用隐藏页面预热HTTP缓存
+    "preload_hints": True,
+    "preload_warm_cache": False,
+    # 卡顿检测：心跳停滞超过阈值后按固定频率采样调用栈，报告写入日志目录
+    # 默认启用，所有窗口隐藏或冻结时心跳与看门狗挂起
+    "stall_detector_enabled": True,
+    "stall_threshold_ms": 200,
+    "stall_heartbeat_ms": 100,
+    "stall_sample_hz": 100.0,
+    "stall_max_reports": 50,
+    # 计算进程池：工作进程数（0为CPU核数-1）、单任务内存上限（0为不限）、
+    # 数组结果经共享内存传递的最小字节数、未取走结果的保留时长、工作进程的nice值
+    "compute_workers": 0,
+    "compute_memory_mb": 0,
+    "compute_shm_threshold_kb": 64,
+    "compute_result_ttl_s": 60.0,
+    "compute_worker_nice": 5,
+}
+
+# 命名性能预设，值覆盖默认配置
+PERFORMANCE_PRESETS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    # 低内存展示终端：单渲染进程、小缓存、少线程
+    "low-memory-kiosk": {
+        "log_level": "WARNING",
+        "server_workers": 2,
+        "server_request_queue": 8,
+        "http_cache_mb": 16,
+        "renderer_process_limit": 1,
+        "raster_threads": 1,
+        "low_end_device_mode": True,
+        "lifecycle_freeze_after_s": 5.0,
+        "lifecycle_discard_after_s": 120.0,
+        "lifecycle_discard_rss_mb": 256,
+        "proxy_cache_mb": 32,
+        "proxy_pool_size": 2,
+        "download_max_concurrent": 1,
+        "download_progress_hz": 10.0,
+        "stall_sample_hz": 50.0,
+        "stall_max_reports": 10,
+        "compute_workers": 1,
+        "compute_memory_mb": 256,
+    },
+    # 高吞吐工作站：更多并发与缓存
+    "throughput-workstation": {
+        "server_workers": 32,
+        "server_request_queue": 128,
+        "http_cache_mb": 512,
+        "renderer_process_limit": 8,
+        "raster_threads": 4,
+        "proxy_cache_mb": 1024,
+        "proxy_pool_size": 32,
+        "preload_warm_cache": True,
+    },
+    # 无GPU虚拟机：关闭GPU，走软件渲染
+    "software-render-vm": {
+        "server_workers": 4,
+        "http_cache_mb": 64,
+        "renderer_process_limit": 2,
+        "raster_threads": 2,
+        "disable_gpu": True,
+        "lifecycle_freeze_after_s": 10.0,
+        "lifecycle_discard_after_s": 300.0,
+    },
+}
+
+# 配置文件默认位置、环境变量前缀
+DEFAULT_PROFILE_FILE = Path(__file__).resolve().parent / "profile.json"
+ENV_PREFIX = "PYQT6WEB_"
+
+
+class ProfileError(ValueError):
+    """性能配置无效"""
+
+
+class PerformanceProfile:
+    """分层性能配置：默认值 → 预设 → 配置文件 → 环境变量 → 命令行"""
+    _active: Optional["PerformanceProfile"] = None
+
+    def __init__(self, values: Dict[str, Any], preset: str, sources: Dict[str, str]):
+        self.values = values
+        self.preset = preset
+        self.sources = sources  # 每个配置项的来源层
+
+    def get(self, key: str) -> Any:
+        """读取配置项"""
+        return self.values[key]
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    @classmethod
+    def load(
+        cls,
+        argv: Optional[List[str]] = None,
+        environ: Optional[Dict[str, str]] = None,
+        profile_file: Optional[str] = None
+    ) -> "PerformanceProfile":
+        """
+        按层合并配置并设为当前配置
+
+        Args:
+            argv: 命令行参数，识别 --preset、--profile、--set key=value
+            environ: 环境变量，识别 PYQT6WEB_PRESET、PYQT6WEB_PROFILE、PYQT6WEB_<KEY>
+            profile_file: 配置文件路径（JSON），优先级低于命令行 --profile
+
+        Returns:
+            合并后的配置
+        """
+        environ = os.environ if environ is None else environ
+        cli = _parse_cli(argv or [])
+
+        # 配置文件路径：命令行 > 环境变量 > 参数 > 默认位置
+        path = (cli["profile"] or environ.get(f"{ENV_PREFIX}PROFILE")
+                or profile_file or str(DEFAULT_PROFILE_FILE))
+        file_values = _read_file(path)
+        env_values = {
+            key: environ[f"{ENV_PREFIX}{key.upper()}"]
+            for key in PROFILE_DEFAULTS
+            if f"{ENV_PREFIX}{key.upper()}" in environ
+        }
+
+        # 预设名称：命令行 > 环境变量 > 配置文件 > default
+        preset = (cli["preset"] or environ.get(f"{ENV_PREFIX}PRESET")
+                  or file_values.pop("preset", None) or "default")
+        file_values.pop("preset", None)
+        if preset not in PERFORMANCE_PRESETS:
+            raise ProfileError(
+                f"未知性能预设: {preset}，可选: {', '.join(PERFORMANCE_PRESETS)}"
+            )
+
+        values = dict(PROFILE_DEFAULTS)
+        sources = {key: "default" for key in values}
+        layers = [
+            (f"preset:{preset}", PERFORMANCE_PRESETS[preset]),
+            (f"file:{path}", file_values),
+            ("env", env_values),
+            ("cli", cli["overrides"]),
+        ]
+        for source, layer in layers:
+            for key, raw in layer.items():
+                if key not in PROFILE_DEFAULTS:
+                    raise ProfileError(f"未知配置项: {key} (来源: {source})")
+                values[key] = _coerce(key, raw)
+                sources[key] = source
+
+        cls._active = cls(values, preset, sources)
+        return cls._active
+
+    @classmethod
+    def active(cls) -> "PerformanceProfile":
+        """获取当前配置，未加载时使用默认值"""
+        if cls._active is None:
+            cls._active = cls(dict(PROFILE_DEFAULTS), "default",
+                              {key: "default" for key in PROFILE_DEFAULTS})
+        return cls._active
+
+    def chromium_flags(self) -> List[str]:
+        """根据配置生成Chromium命令行参数"""
+        flags = []
+        if self.values["renderer_process_limit"] > 0:
+            flags.append(f"--renderer-process-limit={self.values['renderer_process_limit']}")
+        if self.values["http_cache_mb"] > 0:
+            flags.append(f"--disk-cache-size={self.values['http_cache_mb'] * 1024 * 1024}")
+        if self.values["raster_threads"] > 0:
+            flags.append(f"--num-raster-threads={self.values['raster_threads']}")
+        if self.values["disable_gpu"]:
+            flags.extend(["--disable-gpu", "--disable-gpu-compositing"])
+        if self.values["low_end_device_mode"]:
+            flags.append("--enable-low-end-device-mode")
+        flags.extend(self.values["extra_chromium_flags"].split())
+        return flags
+
+    def apply_chromium_flags(self) -> str:
+        """写入 QTWEBENGINE_CHROMIUM_FLAGS，必须在创建QApplication之前调用"""
+        existing = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+        flags = " ".join(existing + self.chromium_flags())
+        if flags:
+            os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = flags
+        return flags
+
+    def describe(self) -> List[str]:
+        """生成用于日志输出的生效配置"""
+        lines = [f"性能预设: {self.preset}"]
+        for key in PROFILE_DEFAULTS:
+            lines.append(f"  {key} = {self.values[key]!r} ({self.sources[key]})")
+        return lines
+
+
+def strip_profile_args(argv: List[str]) -> List[str]:
+    """移除性能配置相关的命令行参数，其余参数交给QApplication"""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in ("--preset", "--profile", "--set"):
+            skip = "=" not in arg
+            continue
+        result.append(arg)
+    return result
+
+
+def _parse_cli(argv: List[str]) -> Dict[str, Any]:
+    """解析命令行中的配置参数"""
+    result = {"preset": None, "profile": None, "overrides": {}}
+    args = iter(argv)
+    for arg in args:
+        name, has_value, value = arg.partition("=")
+        if name not in ("--preset", "--profile", "--set"):
+            continue
+        if not has_value:
+            value = next(args, None)
+            if value is None:
+                raise ProfileError(f"命令行参数缺少值: {name}")
+        if name == "--set":
+            key, sep, raw = value.partition("=")
+            if not sep:
+                raise ProfileError(f"--set 参数格式应为 key=value: {value}")
+            result["overrides"][key.strip()] = raw
+        else:
+            result[name[2:]] = value
+    return result
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    """读取JSON配置文件，文件不存在时返回空配置"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ProfileError(f"配置文件读取失败: {path}, 错误: {e}") from e
+    if not isinstance(data, dict):
+        raise ProfileError(f"配置文件必须是JSON对象: {path}")
+    return data
+
+
+def _coerce(key: str, raw: Any) -> Any:
+    """按默认值类型转换配置值（环境变量和命令行均为字符串）"""
+    default = PROFILE_DEFAULTS[key]
+    if not isinstance(raw, str) or isinstance(default, str):
+        value = raw
+    elif isinstance(default, bool):
+        lowered = raw.strip().lower()
+        if lowered not in ("1", "0", "true", "false", "yes", "no", "on", "off"):
+            raise ProfileError(f"配置项 {key} 需要布尔值: {raw}")
+        value = lowered in ("1", "true", "yes", "on")
+    elif isinstance(default, (int, float)):
+        try:
+            value = type(default)(raw)
+        except ValueError as e:
+            raise ProfileError(f"配置项 {key} 需要数值: {raw}") from e
+    else:
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            raise ProfileError(f"配置项 {key} 需要JSON值: {raw}") from e
+    if type(value) is not type(default) and not (
+            isinstance(default, float) and isinstance(value, int)):
+        raise ProfileError(f"配置项 {key} 类型错误: {value!r}")
+    return value
@@ -9,9 +9,16 @@ class AppConfig:
     ORGANIZATION_DOMAIN = "pyqt6.example"
     
     # 网络配置
+    # 只监听本机回环地址，内嵌服务器（含缓存代理）不对局域网开放
+    SERVER_HOST = "127.0.0.1"
     DEFAULT_PORT = 8060
     MAX_PORT_ATTEMPTS = 20
     
+    # 桥接配置：出站暂停期间最多缓存的消息数
+    BRIDGE_PAUSE_QUEUE_SIZE = 500
+    # JavaScript调用默认超时（毫秒）
+    JS_CALL_TIMEOUT_MS = 5000
+    
     # 路径配置
     VUE_DIST_PATH = "vue/dist"
     HTML_ENTRY = "index.html"
@@ -19,9 +26,17 @@ class AppConfig:
     ICON_PATH = "assets/icon/qt.ico"
     TRANSLATIONS_PATH = "translations"
     
+    # WebEngine配置名称（多窗口共享缓存与渲染进程池）
+    WEB_PROFILE_NAME = "pyqt6web"
+    
     # 界面配置
     WINDOW_WIDTH = 900
     WINDOW_HEIGHT = 600
+    # 运行时切换卡顿检测的快捷键
+    STALL_DETECTOR_SHORTCUT = "Ctrl+Shift+F9"
+    # 性能浮层与指标快照导出的快捷键
+    PERF_HUD_SHORTCUT = "Ctrl+Shift+F10"
+    METRICS_EXPORT_SHORTCUT = "Ctrl+Shift+F11"
     SPLASH_WIDTH = 400
     SPLASH_HEIGHT = 200
     
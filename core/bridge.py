@@ -1,8 +1,26 @@
+import json
+import functools
+from collections import deque
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 from PyQt6.QtWebChannel import QWebChannel
 from PyQt6.QtWebEngineCore import QWebEnginePage 
 from config.settings import AppConfig
-from utils.logger import info, debug
+from utils import metrics
+from utils.logger import info, debug, error
+
+# 桥接指标：页面调用Python槽的次数、Python发往页面的消息数
+_inbound_calls = metrics.counter("bridge.calls")
+_outbound_messages = metrics.counter("bridge.outbound")
+
+
+def _metered(func):
+    """统计页面对槽函数的调用次数（置于pyqtSlot之下）"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _inbound_calls.inc()
+        return func(*args, **kwargs)
+    return wrapper
+
 
 class Bridge(QObject):
     """Qt与Web页面通信的桥接类"""
@@ -10,19 +28,37 @@ class Bridge(QObject):
     # 信号定义 - 发送消息到Web页面
     messageFromQt = pyqtSignal(str)
     jsonFromQt = pyqtSignal(dict)
+    # Python侧通知 - 页面回传的JavaScript批量调用结果（JSON）
+    jsCallsResolved = pyqtSignal(str)
+    # 下载信号 - 任务ID, 已接收字节, 总字节 / 任务ID, 文件路径 / 任务ID, 错误信息
+    downloadProgress = pyqtSignal(str, float, float)
+    downloadFinished = pyqtSignal(str, str)
+    downloadFailed = pyqtSignal(str, str)
+    # 数据集信号 - 表名, 当前行数（页面据此重新请求可见窗口）
+    datasetChanged = pyqtSignal(str, float)
+    # 计算信号 - 任务ID, 结果JSON / 任务ID, 错误信息
+    computeFinished = pyqtSignal(str, str)
+    computeFailed = pyqtSignal(str, str)
     
     def __init__(self, parent: QObject = None):
         super().__init__(parent)
         self.web_message_count = 0
-        self.channel = QWebChannel(self)
-        self.channel.registerObject("bridge", self)
+        # 出站暂停时的待发送队列：(信号, 参数)，超出上限丢弃最旧消息
+        self.outbound_paused = False
+        self.outbound_queue = deque(maxlen=AppConfig.BRIDGE_PAUSE_QUEUE_SIZE)
+        self.downloads = None  # 下载管理器，由 attach_downloads 设置
+        self.datasets = None  # 数据集引擎，由 attach_datasets 设置
+        self.compute = None  # 计算服务，由 attach_compute 设置
     
     def setup_channel(self, page: QWebEnginePage) -> None:
-        """设置WebChannel到指定页面"""
-        page.setWebChannel(self.channel)
+        """为指定页面创建WebChannel并注册桥接对象"""
+        channel = QWebChannel(page)
+        channel.registerObject("bridge", self)
+        page.setWebChannel(channel)
         info("WebChannel已绑定到页面")
     
     @pyqtSlot(str)
+    @_metered
     def processWebMessage(self, message: str) -> None:
         """处理来自Web页面的字符串消息"""
         self.web_message_count += 1
@@ -30,6 +66,7 @@ class Bridge(QObject):
         self.messageFromQt.emit(f"已收到消息: {message}...")
     
     @pyqtSlot(dict)
+    @_metered
     def processWebJson(self, data: dict) -> None:
         """处理来自Web页面的JSON数据"""
         self.web_message_count += 1
@@ -49,32 +86,358 @@ class Bridge(QObject):
         self.jsonFromQt.emit(response)
     
     @pyqtSlot(result=str)
+    @_metered
     def getQtVersion(self) -> str:
         """获取Qt版本信息"""
         from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
         return f"PyQt6 版本: {PYQT_VERSION_STR}, Qt 版本: {QT_VERSION_STR}"
     
     @pyqtSlot(int, int, result=int)
+    @_metered
     def calculateSum(self, a: int, b: int) -> int:
         """计算两个数的和"""
         result = a + b
         debug(f"计算 {a} + {b} = {result}")
         return result
     
-    @pyqtSlot(int)
-    def receiveCalculationResult(self, result: int) -> None:
-        """接收Web页面返回的计算结果"""
-        info(f"收到Web计算结果: {result}")
+    @pyqtSlot(str)
+    @_metered
+    def resolveJsCalls(self, payload: str) -> None:
+        """接收页面回传的JavaScript批量调用结果，由JsEvaluator按调用ID匹配"""
+        self.jsCallsResolved.emit(payload)
+    
+    def attach_downloads(self, manager) -> None:
+        """接入下载管理器，下载进度与结果转发到页面"""
+        self.downloads = manager
+        manager.progress.connect(self.downloadProgress)
+        manager.finished.connect(self.downloadFinished)
+        manager.failed.connect(self.downloadFailed)
+    
+    @pyqtSlot(str, str, result=str)
+    @_metered
+    def startDownload(self, url: str, options: str) -> str:
+        """
+        由Python流式下载文件到磁盘，返回任务ID，参数无效时返回空字符串
+        
+        options为JSON：filename、method、body（字符串）、headers、sha256
+        （请求不携带WebEngine配置中的Cookie，需要鉴权时由页面在headers中传入凭据）
+        """
+        if self.downloads is None:
+            return ""
+        # 槽函数抛出的异常会使PyQt终止进程，页面传入的参数一律在此拦截
+        try:
+            opts = json.loads(options) if options else {}
+            body = opts.get("body")
+            return self.downloads.start(
+                url,
+                filename=opts.get("filename"),
+                method=str(opts.get("method", "GET")),
+                body=body.encode("utf-8") if body is not None else None,
+                headers={str(k): str(v) for k, v in (opts.get("headers") or {}).items()},
+                sha256=opts.get("sha256")
+            )
+        except Exception as e:
+            error(f"下载任务创建失败 | URL: {url}, 错误: {str(e)}")
+            return ""
+    
+    @pyqtSlot(str, result=bool)
+    @_metered
+    def pauseDownload(self, task_id: str) -> bool:
+        """暂停下载"""
+        return self.downloads is not None and self.downloads.pause(task_id)
+    
+    @pyqtSlot(str, result=bool)
+    @_metered
+    def resumeDownload(self, task_id: str) -> bool:
+        """断点续传"""
+        return self.downloads is not None and self.downloads.resume(task_id)
+    
+    @pyqtSlot(str, result=bool)
+    @_metered
+    def cancelDownload(self, task_id: str) -> bool:
+        """取消下载"""
+        return self.downloads is not None and self.downloads.cancel(task_id)
+    
+    def attach_datasets(self, engine) -> None:
+        """接入数据集引擎，数据变化时通知页面"""
+        self.datasets = engine
+        engine.listeners.append(lambda name, size: self.datasetChanged.emit(name, float(size)))
+    
+    @pyqtSlot(str, result=str)
+    @_metered
+    def datasetQuery(self, request: str) -> str:
+        """
+        查询数据表的行窗口
+        
+        request为JSON：table、offset、length、sort_by、descending、filters、columns
+        """
+        def run(req):
+            table = self.datasets.table(req["table"])
+            return table.query(
+                offset=int(req.get("offset", 0)),
+                length=int(req.get("length", 100)),
+                sort_by=req.get("sort_by"),
+                descending=bool(req.get("descending", False)),
+                filters=req.get("filters") or (),
+                columns=req.get("columns")
+            )
+        return self._dataset_call(request, run)
+    
+    @pyqtSlot(str, result=str)
+    @_metered
+    def datasetAggregate(self, request: str) -> str:
+        """
+        对数据表做聚合计算
+        
+        request为JSON：table、column、functions、filters、group_by
+        """
+        def run(req):
+            table = self.datasets.table(req["table"])
+            return table.aggregate(
+                req["column"],
+                functions=req.get("functions") or ("count", "sum", "mean", "min", "max"),
+                filters=req.get("filters") or (),
+                group_by=req.get("group_by")
+            )
+        return self._dataset_call(request, run)
+    
+    @pyqtSlot(str, result=str)
+    @_metered
+    def datasetSchema(self, name: str) -> str:
+        """获取数据表结构与行数"""
+        return self._dataset_call(json.dumps({"table": name}),
+                                  lambda req: self.datasets.table(req["table"]).describe())
+    
+    def attach_compute(self, service) -> None:
+        """接入计算服务，任务结果转发到页面"""
+        self.compute = service
+        service.finished.connect(self.computeFinished)
+        service.failed.connect(self.computeFailed)
+    
+    @pyqtSlot(str, str, result=str)
+    @_metered
+    def submitCompute(self, task: str, options: str) -> str:
+        """
+        提交进程池计算任务，返回任务ID（失败返回空字符串），结果经 computeFinished 返回
+        
+        options为JSON：args、kwargs、priority、memory_mb
+        """
+        if self.compute is None:
+            return ""
+        try:
+            opts = json.loads(options) if options else {}
+            memory_mb = opts.get("memory_mb")
+            return self.compute.submit(
+                task,
+                args=opts.get("args"),
+                kwargs=opts.get("kwargs"),
+                priority=int(opts.get("priority", 0)),
+                memory_limit_mb=int(memory_mb) if memory_mb is not None else None
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            debug(f"计算任务提交失败 | 任务: {task}, 错误: {str(e)}")
+            return ""
+        except Exception as e:
+            # 槽函数抛出的异常会终止应用，其余错误同样只返回空字符串
+            error(f"计算任务提交异常 | 任务: {task}, 错误: {str(e)}", exc_info=True)
+            return ""
+    
+    @pyqtSlot(str, result=bool)
+    @_metered
+    def cancelCompute(self, job_id: str) -> bool:
+        """取消计算任务"""
+        return self.compute is not None and self.compute.cancel(job_id)
+    
+    def _dataset_call(self, request: str, run) -> str:
+        """执行数据集请求，错误以JSON返回给页面"""
+        if self.datasets is None:
+            return json.dumps({"error": "数据集引擎不可用"}, ensure_ascii=False)
+        try:
+            return json.dumps(run(json.loads(request)), ensure_ascii=False)
+        except (ValueError, KeyError, TypeError) as e:
+            debug(f"数据集请求失败 | 请求: {request}, 错误: {str(e)}")
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
+        except Exception as e:
+            # 槽函数抛出的异常会使PyQt终止进程，其余异常同样以错误结果返回
+            error(f"数据集请求异常 | 请求: {request}, 错误: {str(e)}", exc_info=True)
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
     
     def send_message_to_web(self, message: str) -> None:
         """发送消息到Web页面"""
-        self.messageFromQt.emit(message)
+        self._emit_outbound(self.messageFromQt, message)
     
     def send_json_to_web(self, data: dict) -> None:
         """发送JSON数据到Web页面"""
-        self.jsonFromQt.emit(data)
+        self._emit_outbound(self.jsonFromQt, data)
+    
+    def pause_outbound(self) -> None:
+        """暂停向页面发送消息，期间的消息进入队列"""
+        if not self.outbound_paused:
+            self.outbound_paused = True
+            debug("桥接出站消息已暂停")
+    
+    def resume_outbound(self) -> None:
+        """恢复向页面发送消息，并按顺序补发队列中的消息"""
+        if not self.outbound_paused:
+            return
+        self.outbound_paused = False
+        pending = len(self.outbound_queue)
+        while self.outbound_queue:
+            signal, args = self.outbound_queue.popleft()
+            _outbound_messages.inc()
+            signal.emit(*args)
+        debug(f"桥接出站消息已恢复 | 补发: {pending}")
+    
+    def _emit_outbound(self, signal, *args) -> None:
+        """发送或暂存出站消息"""
+        if self.outbound_paused:
+            self.outbound_queue.append((signal, args))
+        else:
+            _outbound_messages.inc()
+            signal.emit(*args)
+    
+    def pending_outbound(self) -> int:
+        """暂停期间积压的出站消息数"""
+        return len(self.outbound_queue)
     
     def _get_timestamp(self) -> str:
         """获取当前时间戳"""
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class WindowEndpoint(QObject):
+    """窗口专属的通道对象，只注册在该窗口页面的WebChannel中，定向消息不会发往其他页面"""
+    
+    # 定向消息 - 内容
+    messageFromQt = pyqtSignal(str)
+    # 性能上报开关，页面开启后定期调用 bridge.reportPageMetrics
+    metricsRequested = pyqtSignal(bool)
+
+
+class BridgeHub(Bridge):
+    """多窗口共享的桥接中心：每个页面一个WebChannel，共享同一桥接对象，定向消息经窗口专属对象发送"""
+    
+    # Python侧通知 - 某窗口页面发来的消息 (窗口ID, 内容)
+    windowMessageReceived = pyqtSignal(str, str)
+    
+    # 页面上报的指标：上报字段 -> 指标名
+    PAGE_METRICS = {"jsHeapMb": "page.js_heap_mb", "fps": "page.fps"}
+    
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.pages = {}  # 窗口ID -> QWebEnginePage
+        self.endpoints = {}  # 窗口ID -> (WebChannel, WindowEndpoint)
+        self.paused_windows = {}  # 窗口ID -> 暂停期间的定向消息队列
+    
+    def attach(self, window_id: str, page: QWebEnginePage) -> None:
+        """为窗口页面创建WebChannel，注册共享桥接对象（bridge）和窗口专属对象（window）"""
+        channel = QWebChannel(page)
+        endpoint = WindowEndpoint(channel)
+        channel.registerObject("bridge", self)
+        channel.registerObject("window", endpoint)
+        self.pages[window_id] = page
+        self.endpoints[window_id] = (channel, endpoint)
+        page.setWebChannel(channel)
+        info(f"WebChannel已绑定到窗口 | 窗口: {window_id}, 窗口数: {len(self.pages)}")
+    
+    def detach(self, window_id: str) -> None:
+        """解除窗口页面的WebChannel"""
+        page = self.pages.pop(window_id, None)
+        channel, _ = self.endpoints.pop(window_id, (None, None))
+        self.paused_windows.pop(window_id, None)
+        for name in self.PAGE_METRICS.values():
+            metrics.registry.remove(f"{name}[{window_id}]")
+        self._update_outbound_pause()
+        if page is not None:
+            page.setWebChannel(None)
+            debug(f"WebChannel已解绑窗口 | 窗口: {window_id}")
+        if channel is not None:
+            channel.deregisterObject(self)
+            channel.deleteLater()
+    
+    @pyqtSlot(str, str)
+    @_metered
+    def processWindowMessage(self, window_id: str, message: str) -> None:
+        """处理来自指定窗口页面的字符串消息，回复只发往该窗口"""
+        self.web_message_count += 1
+        info(f"收到Web消息 | 窗口: {window_id}, 编号: {self.web_message_count}, 内容: {message}...")
+        self.windowMessageReceived.emit(window_id, message)
+        self.send_to(window_id, f"已收到消息: {message}...")
+    
+    def send_to(self, window_id: str, message: str) -> None:
+        """发送消息到指定窗口，窗口暂停时进入该窗口的队列"""
+        queue = self.paused_windows.get(window_id)
+        if queue is not None:
+            queue.append(message)
+        else:
+            self._emit_to(window_id, message)
+    
+    def _emit_to(self, window_id: str, message: str) -> None:
+        """经窗口专属对象发送，只有该窗口的WebChannel会序列化和投递"""
+        endpoint = self.endpoints.get(window_id, (None, None))[1]
+        if endpoint is None:
+            debug(f"定向消息目标窗口不存在 | 窗口: {window_id}")
+            return
+        _outbound_messages.inc()
+        endpoint.messageFromQt.emit(message)
+    
+    def broadcast(self, message: str) -> None:
+        """发送消息到所有窗口"""
+        self.send_message_to_web(message)
+    
+    def pause_window(self, window_id: str) -> None:
+        """暂停向指定窗口发送消息，所有窗口都暂停时广播也暂停"""
+        if window_id not in self.paused_windows:
+            self.paused_windows[window_id] = deque(maxlen=AppConfig.BRIDGE_PAUSE_QUEUE_SIZE)
+            self._update_outbound_pause()
+    
+    def resume_window(self, window_id: str) -> None:
+        """恢复向指定窗口发送消息，并补发暂停期间的定向消息"""
+        queue = self.paused_windows.pop(window_id, None)
+        if queue is None:
+            return
+        self._update_outbound_pause()
+        while queue:
+            self._emit_to(window_id, queue.popleft())
+    
+    def pending_outbound(self) -> int:
+        """广播队列与各暂停窗口定向队列中积压的消息数"""
+        return super().pending_outbound() + sum(len(queue) for queue in self.paused_windows.values())
+    
+    def request_page_metrics(self, window_id: str, enabled: bool) -> None:
+        """开启或关闭指定窗口页面的性能上报（仅在需要展示时开启，避免常驻开销），只发往该窗口"""
+        endpoint = self.endpoints.get(window_id, (None, None))[1]
+        if endpoint is not None:
+            endpoint.metricsRequested.emit(enabled)
+    
+    @pyqtSlot(str, str, result=bool)
+    @_metered
+    def reportPageMetrics(self, window_id: str, payload: str) -> bool:
+        """
+        接收页面上报的性能数据
+        
+        payload为JSON：jsHeapMb、fps、rttMs（页面测得的上一次上报往返耗时）
+        """
+        try:
+            data = json.loads(payload)
+            if not isinstance(data, dict):
+                return False
+            # 先全部转换，格式错误时不写入部分指标
+            values = {key: float(data[key]) for key in (*self.PAGE_METRICS, "rttMs")
+                      if data.get(key) is not None}
+        except (ValueError, TypeError, AttributeError):
+            return False
+        for key, name in self.PAGE_METRICS.items():
+            if key in values:
+                metrics.gauge(f"{name}[{window_id}]").set(values[key])
+        if "rttMs" in values:
+            metrics.histogram("bridge.page_rtt_ms").observe(values["rttMs"])
+        return True
+    
+    def _update_outbound_pause(self) -> None:
+        """所有已接入窗口都暂停时暂停广播，否则恢复"""
+        if self.pages and all(window_id in self.paused_windows for window_id in self.pages):
+            self.pause_outbound()
+        else:
+            self.resume_outbound()
@@ -0,0 +1,312 @@
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from core import compute_tasks
+from utils import metrics
+from utils.logger import info, warning, error, debug
+
+# 页面获取二进制结果的服务器路径前缀
+COMPUTE_PATH_PREFIX = "/__compute/"
+
+_completed_jobs = metrics.counter("compute.jobs")
+_failed_jobs = metrics.counter("compute.failures")
+_job_duration = metrics.histogram("compute.job_ms")
+
+
+class ComputeJob:
+    """单个计算任务的状态"""
+
+    def __init__(self, job_id: str, task: str, args: list, kwargs: dict, priority: int, memory_limit: int):
+        self.id = job_id
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority  # 数值越大越先执行
+        self.memory_limit = memory_limit
+        self.state = "queued"  # queued / running / finished / failed / cancelled
+        self.submitted_at = time.monotonic()
+
+
+class ResultBuffer:
+    """工作进程放在共享内存中的数组结果，由主进程持有直到页面取走或过期"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, dtype: str, shape: List[int], nbytes: int, expires_at: float):
+        self.shm = shm
+        self.dtype = dtype
+        self.shape = shape
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+
+    def view(self) -> memoryview:
+        """结果数据的只读视图，使用后需释放"""
+        return self.shm.buf[:self.nbytes].toreadonly()
+
+    def release(self) -> None:
+        """关闭并删除共享内存"""
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            debug(f"共享内存释放失败 | 名称: {self.shm.name}, 错误: {str(e)}")
+
+
+class ComputeService(QObject):
+    """
+    进程池计算服务：注册的CPU密集任务在预热的工作进程中执行，不占用GUI进程的GIL；
+    任务按优先级调度，排队中的任务可取消，运行中的任务取消后丢弃结果；
+    大数组结果经共享内存交给主进程，再由内嵌服务器以二进制形式提供给页面
+    """
+
+    # 信号定义（由进程池回调线程发出，跨线程排队投递）
+    finished = pyqtSignal(str, str)  # 任务ID, 结果JSON
+    failed = pyqtSignal(str, str)  # 任务ID, 错误信息
+
+    def __init__(self, workers: int = 0, memory_limit_mb: int = 0, shm_threshold_kb: int = 64,
+                 result_ttl: float = 60.0, worker_nice: int = 5, parent: QObject = None):
+        super().__init__(parent)
+        # 默认保留一个核心给GUI进程
+        self.workers = workers if workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.shm_threshold = shm_threshold_kb * 1024
+        self.result_ttl = result_ttl
+        self.worker_nice = worker_nice
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.generation = 0  # 进程池代数，每次重建加一，用于识别已被替换的进程池的回调
+        self.jobs: Dict[str, ComputeJob] = {}
+        self.queue: List[Tuple[int, int, ComputeJob]] = []  # (-优先级, 序号, 任务)
+        self.running = 0
+        self.results: Dict[str, ResultBuffer] = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        metrics.gauge("compute.queue", lambda: len(self.queue) + self.running)
+
+        # 定期释放过期结果，只在有任务或结果时运行
+        self.expiry_timer = QTimer(self)
+        self.expiry_timer.setInterval(int(min(max(result_ttl, 1.0), 10.0) * 1000))
+        self.expiry_timer.timeout.connect(self._on_expiry_timer)
+
+    @classmethod
+    def from_profile(cls, profile, parent: QObject = None) -> "ComputeService":
+        """根据性能配置创建计算服务"""
+        return cls(
+            workers=profile.get("compute_workers"),
+            memory_limit_mb=profile.get("compute_memory_mb"),
+            shm_threshold_kb=profile.get("compute_shm_threshold_kb"),
+            result_ttl=profile.get("compute_result_ttl_s"),
+            worker_nice=profile.get("compute_worker_nice"),
+            parent=parent
+        )
+
+    def start(self) -> None:
+        """创建进程池并预热全部工作进程，首次提交任务时自动调用"""
+        if self.executor is not None:
+            return
+        # 主进程已有Qt线程，fork不安全，统一使用spawn
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=compute_tasks.init_worker,
+            initargs=(self.worker_nice,)
+        )
+        for _ in range(self.workers):
+            self.executor.submit(compute_tasks.warm_up)
+        info(f"计算服务已启动 | 工作进程: {self.workers}")
+
+    def submit(self, task: str, args: Optional[list] = None, kwargs: Optional[dict] = None,
+               priority: int = 0, memory_limit_mb: Optional[int] = None) -> str:
+        """
+        提交计算任务
+
+        Args:
+            task: compute_tasks 中注册的任务名
+            args: 位置参数
+            kwargs: 关键字参数
+            priority: 优先级，数值越大越先执行
+            memory_limit_mb: 任务内存上限，默认使用服务配置（0为不限）
+
+        Returns:
+            任务ID
+        """
+        if task not in compute_tasks.TASKS:
+            raise KeyError(f"未注册的计算任务: {task}")
+        limit = self.memory_limit if memory_limit_mb is None else memory_limit_mb * 1024 * 1024
+        job = ComputeJob(f"job-{next(self._ids)}", task, list(args or []), dict(kwargs or {}), priority, limit)
+        self.start()
+        if not self.expiry_timer.isActive():
+            self.expiry_timer.start()
+        with self.lock:
+            self.jobs[job.id] = job
+            heapq.heappush(self.queue, (-priority, next(self._seq), job))
+        debug(f"计算任务提交 | ID: {job.id}, 任务: {task}, 优先级: {priority}")
+        self._dispatch()
+        return job.id
+
+    def cancel(self, job_id: str) -> bool:
+        """取消任务：排队中的直接移除，运行中的在完成后丢弃结果"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state not in ("queued", "running"):
+                return False
+            was_queued = job.state == "queued"
+            job.state = "cancelled"
+            if was_queued:
+                # 堆中的条目在调度时跳过
+                self.jobs.pop(job_id, None)
+        self.failed.emit(job_id, "任务已取消")
+        info(f"计算任务已取消 | ID: {job_id}, {'排队中' if was_queued else '运行中，结果将丢弃'}")
+        return True
+
+    def take_result(self, job_id: str) -> Optional[ResultBuffer]:
+        """取走数组结果（只能取一次），调用方使用后负责 release"""
+        self._expire_results()
+        with self.lock:
+            return self.results.pop(job_id, None)
+
+    def shutdown(self) -> None:
+        """停止进程池并释放未取走的结果，仍在运行的任务完成后只释放结果、不再发出信号"""
+        self.expiry_timer.stop()
+        with self.lock:
+            for job in self.jobs.values():
+                job.state = "cancelled"
+            self.queue = []
+            results, self.results = list(self.results.values()), {}
+        for buffer in results:
+            buffer.release()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        metrics.registry.remove("compute.queue")
+        info("计算服务已停止")
+
+    def _dispatch(self) -> None:
+        """按优先级把任务交给空闲的工作进程，进程池内部队列始终不超过工作进程数"""
+        while True:
+            with self.lock:
+                if self.executor is None or self.running >= self.workers or not self.queue:
+                    return
+                _, _, job = heapq.heappop(self.queue)
+                if job.state != "queued":
+                    continue
+                job.state = "running"
+                self.running += 1
+                executor, generation = self.executor, self.generation
+            try:
+                future = executor.submit(
+                    compute_tasks.execute, job.task, job.args, job.kwargs,
+                    job.memory_limit, self.shm_threshold
+                )
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._finish(job)
+                self._fail(job, f"进程池不可用: {str(e)}")
+                self._restart_pool(generation)
+                continue
+            future.add_done_callback(partial(self._on_done, job, generation))
+
+    def _on_done(self, job: ComputeJob, generation: int, future) -> None:
+        """进程池回调：发布结果或丢弃已取消任务的结果，然后调度下一个任务"""
+        self._finish(job)
+        try:
+            kind, payload = future.result()
+        except BrokenProcessPool as e:
+            self._fail(job, f"工作进程异常退出: {str(e)}")
+            self._restart_pool(generation)
+            self._dispatch()
+            return
+        except Exception as e:
+            self._fail(job, str(e))
+            self._dispatch()
+            return
+
+        buffer = self._attach(payload) if kind == "array" else None
+        # 状态检查与置为完成在同一把锁内，并发的 cancel() 不会既发出取消又发出完成
+        with self.lock:
+            cancelled = job.state == "cancelled"
+            if not cancelled:
+                job.state = "finished"
+                if buffer is not None:
+                    self.results[job.id] = buffer
+        if cancelled:
+            if buffer is not None:
+                buffer.release()
+            debug(f"已取消任务的结果已丢弃 | ID: {job.id}")
+        else:
+            if buffer is not None:
+                result = {"binary": {
+                    "url": f"{COMPUTE_PATH_PREFIX}{job.id}",
+                    "dtype": payload["dtype"],
+                    "shape": payload["shape"],
+                    "nbytes": payload["nbytes"],
+                }}
+            else:
+                result = {"value": payload}
+            elapsed = time.monotonic() - job.submitted_at
+            _completed_jobs.inc()
+            _job_duration.observe(elapsed * 1000)
+            info(f"计算任务完成 | ID: {job.id}, 任务: {job.task}, 耗时: {elapsed:.3f}s")
+            self.finished.emit(job.id, json.dumps(result, ensure_ascii=False))
+        self._expire_results()
+        self._dispatch()
+
+    def _attach(self, payload: Dict[str, Any]) -> ResultBuffer:
+        shm = shared_memory.SharedMemory(name=payload["shm"])
+        return ResultBuffer(shm, payload["dtype"], payload["shape"], payload["nbytes"],
+                            time.monotonic() + self.result_ttl)
+
+    def _finish(self, job: ComputeJob) -> None:
+        with self.lock:
+            self.running -= 1
+            self.jobs.pop(job.id, None)
+
+    def _fail(self, job: ComputeJob, message: str) -> None:
+        with self.lock:
+            if job.state == "cancelled":
+                return
+            job.state = "failed"
+        _failed_jobs.inc()
+        error(f"计算任务失败 | ID: {job.id}, 任务: {job.task}, 错误: {message}")
+        self.failed.emit(job.id, message)
+
+    def _restart_pool(self, generation: int) -> None:
+        """
+        工作进程崩溃（如被系统因内存终止）后进程池不可再用，重建；
+        一次崩溃会使多个任务同时失败，只有属于当前进程池的回调触发重建
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.generation += 1
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            warning("计算进程池已损坏，正在重建")
+            executor.shutdown(wait=False)
+            self.start()
+
+    def _on_expiry_timer(self) -> None:
+        """定时释放过期结果，没有任务和结果时停止定时器"""
+        self._expire_results()
+        with self.lock:
+            idle = not self.results and not self.jobs
+        if idle:
+            self.expiry_timer.stop()
+
+    def _expire_results(self) -> None:
+        """释放超过保留时间仍未取走的结果"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [job_id for job_id, buffer in self.results.items() if buffer.expires_at < now]
+            buffers = [self.results.pop(job_id) for job_id in expired]
+        for buffer in buffers:
+            buffer.release()
+        if buffers:
+            debug(f"过期计算结果已释放 | 数量: {len(buffers)}")
@@ -0,0 +1,161 @@
+# 计算任务注册表与工作进程入口：本模块在工作进程中导入，不能依赖Qt
+import math
+import os
+from multiprocessing import shared_memory, resource_tracker
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，缺失时只能使用纯Python任务
+    np = None
+
+try:
+    import resource
+except ImportError:  # 非POSIX平台不支持单任务内存上限
+    resource = None
+
+# 任务名 -> 函数
+TASKS: Dict[str, Callable[..., Any]] = {}
+
+
+class ComputeMemoryError(MemoryError):
+    """任务超出内存上限"""
+
+
+def task(name: str):
+    """注册计算任务"""
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+@task("sum")
+def sum_values(a: float, b: float) -> float:
+    """两数求和（calculateSum 的进程外版本）"""
+    return a + b
+
+
+@task("count_primes")
+def count_primes(limit: int) -> int:
+    """统计小于limit的素数个数（纯Python，CPU密集）"""
+    count = 0
+    for n in range(2, int(limit)):
+        if all(n % d for d in range(2, int(math.isqrt(n)) + 1)):
+            count += 1
+    return count
+
+
+@task("random_walk")
+def random_walk(steps: int, walkers: int = 1, seed: Optional[int] = None):
+    """生成 walkers × steps 的随机游走轨迹"""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal((int(walkers), int(steps))), axis=1)
+
+
+@task("moving_average")
+def moving_average(values, window: int):
+    """滑动平均"""
+    data = np.asarray(values, dtype=np.float64)
+    kernel = np.ones(int(window)) / int(window)
+    return np.convolve(data, kernel, mode="valid")
+
+
+@task("histogram")
+def histogram(size: int, bins: int = 50, seed: Optional[int] = None) -> Dict[str, Any]:
+    """正态分布样本的直方图"""
+    rng = np.random.default_rng(seed)
+    counts, edges = np.histogram(rng.standard_normal(int(size)), bins=int(bins))
+    return {"counts": counts, "edges": edges}
+
+
+def init_worker(nice: int) -> None:
+    """工作进程初始化：降低调度优先级，所有核心满载时GUI进程仍能及时获得CPU"""
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def warm_up() -> int:
+    """预热：启动进程并完成模块导入"""
+    return os.getpid()
+
+
+def _address_space() -> int:
+    """当前进程的虚拟地址空间大小"""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit_memory(limit_bytes: int):
+    """在当前地址空间基础上限制任务可新增的内存，返回原限制以便恢复"""
+    if resource is None or limit_bytes <= 0:
+        return None
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        new_soft = _address_space() + limit_bytes
+        if hard != resource.RLIM_INFINITY:
+            new_soft = min(new_soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (new_soft, hard))
+        return soft, hard
+    except (ValueError, OSError):
+        return None
+
+
+def _to_json(value: Any) -> Any:
+    """小型NumPy结果转换为可JSON序列化的Python对象"""
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _export_array(array) -> Dict[str, Any]:
+    """大数组写入共享内存，只回传描述信息，避免经进程管道序列化"""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    target[...] = array
+    del target  # 释放对共享内存的引用后才能关闭
+    # 共享内存归主进程所有并由其释放，工作进程取消登记，避免进程退出时被提前回收
+    # （POSIX下登记的名称带前导斜杠，shm.name 不带）
+    if os.name == "posix":
+        name = shm.name if shm.name.startswith("/") else "/" + shm.name
+        resource_tracker.unregister(name, "shared_memory")
+    shm.close()
+    return {"shm": shm.name, "dtype": array.dtype.name, "shape": list(array.shape), "nbytes": array.nbytes}
+
+
+def execute(name: str, args: list, kwargs: dict, memory_limit: int, shm_threshold: int):
+    """
+    工作进程执行任务
+
+    Returns:
+        ("value", JSON对象) 或 ("array", 共享内存描述)
+    """
+    func = TASKS.get(name)
+    if func is None:
+        raise KeyError(f"未注册的计算任务: {name}")
+    previous = _limit_memory(memory_limit)
+    try:
+        result = func(*args, **kwargs)
+    except MemoryError as e:
+        raise ComputeMemoryError(f"任务超出内存上限 ({memory_limit // (1024 * 1024)}MB)") from e
+    finally:
+        if previous is not None:
+            resource.setrlimit(resource.RLIMIT_AS, previous)
+
+    if np is not None and isinstance(result, np.ndarray) and result.nbytes >= shm_threshold:
+        return "array", _export_array(result)
+    return "value", _to_json(result)
@@ -0,0 +1,403 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.logger import info, debug
+
+# 支持的过滤运算
+FILTER_OPS = ("eq", "ne", "lt", "le", "gt", "ge", "between", "in")
+# 支持的聚合函数
+AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+# 初始列容量，追加时按倍数扩容
+_INITIAL_CAPACITY = 1024
+# 同一数据版本内缓存的查询结果数上限
+_SELECTION_CACHE_SIZE = 32
+# 不同取值数不超过行数的该比例时才为列建立等值哈希索引，其余列的等值过滤在排序索引上二分查找
+_VALUE_INDEX_MAX_RATIO = 0.01
+
+
+class DatasetError(ValueError):
+    """数据集请求无效"""
+
+
+def _is_scalar(value: Any) -> bool:
+    """过滤值只能是JSON标量"""
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+class ColumnarTable:
+    """
+    列式存储的数据表：每列一个NumPy数组，按需构建排序索引和（低基数列的）等值索引，
+    追加数据时增量维护，查询只物化请求的行窗口
+    """
+
+    def __init__(self, name: str, schema: Dict[str, str]):
+        """
+        Args:
+            name: 表名
+            schema: 列名 -> NumPy类型（如 "i8"、"f8"、"bool"），字符串列使用 "str"
+        """
+        if not schema:
+            raise DatasetError("表结构不能为空")
+        self.name = name
+        self.schema = dict(schema)
+        self.size = 0
+        self.version = 0  # 每次追加递增，用于使查询缓存失效
+        self.columns: Dict[str, np.ndarray] = {
+            col: np.empty(_INITIAL_CAPACITY, dtype=self._dtype(kind))
+            for col, kind in schema.items()
+        }
+        self.sort_indexes: Dict[str, np.ndarray] = {}  # 列 -> 按该列升序排列的行号
+        self.value_indexes: Dict[str, Dict[Any, np.ndarray]] = {}  # 低基数列 -> 值 -> 行号
+        self.high_cardinality: set = set()  # 取值过多、不建等值索引的列
+        self.selection_cache: Dict[Tuple, np.ndarray] = {}
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def _dtype(kind: str):
+        return object if kind == "str" else np.dtype(kind)
+
+    def column(self, name: str) -> np.ndarray:
+        """获取列的有效数据视图"""
+        if not isinstance(name, str) or name not in self.columns:
+            raise DatasetError(f"未知列: {name!r}")
+        return self.columns[name][:self.size]
+
+    def append(self, rows) -> int:
+        """
+        追加数据
+
+        Args:
+            rows: 列式数据（列名 -> 序列）或行式数据（字典列表）
+
+        Returns:
+            追加后的总行数
+        """
+        if isinstance(rows, dict):
+            chunk = {col: rows[col] for col in self.schema}
+        else:
+            chunk = {col: [row[col] for row in rows] for col in self.schema}
+        lengths = {len(values) for values in chunk.values()}
+        if len(lengths) != 1:
+            raise DatasetError("各列数据长度不一致")
+        count = lengths.pop()
+        if count == 0:
+            return self.size
+
+        with self.lock:
+            start, end = self.size, self.size + count
+            self._ensure_capacity(end)
+            for col, values in chunk.items():
+                self.columns[col][start:end] = np.asarray(values, dtype=self.columns[col].dtype)
+            self.size = end
+            self.version += 1
+            self.selection_cache.clear()
+            new_rows = np.arange(start, end)
+            for col in self.sort_indexes:
+                self._merge_sort_index(col, new_rows)
+            for col in list(self.value_indexes):
+                self._extend_value_index(col, new_rows)
+        return end
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = len(next(iter(self.columns.values())))
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for col, data in self.columns.items():
+            grown = np.empty(capacity, dtype=data.dtype)
+            grown[:self.size] = data[:self.size]
+            self.columns[col] = grown
+
+    def _sort_index(self, col: str) -> np.ndarray:
+        """获取列的排序索引，首次使用时构建"""
+        index = self.sort_indexes.get(col)
+        if index is None:
+            index = np.argsort(self.column(col), kind="stable")
+            self.sort_indexes[col] = index
+            debug(f"排序索引已构建 | 表: {self.name}, 列: {col}, 行数: {self.size}")
+        return index
+
+    def _merge_sort_index(self, col: str, new_rows: np.ndarray) -> None:
+        """将新行归并进已有排序索引，避免整列重新排序"""
+        index = self.sort_indexes[col]
+        data = self.columns[col]
+        new_sorted = new_rows[np.argsort(data[new_rows], kind="stable")]
+        positions = np.searchsorted(data[index], data[new_sorted], side="right")
+        self.sort_indexes[col] = np.insert(index, positions, new_sorted)
+
+    def _value_limit(self) -> int:
+        """等值索引允许的最大取值数"""
+        return max(1, int(self.size * _VALUE_INDEX_MAX_RATIO))
+
+    def _value_index(self, col: str) -> Optional[Dict[Any, np.ndarray]]:
+        """获取低基数列的等值索引，首次使用时由排序索引分组构建；高基数列返回None"""
+        if col in self.high_cardinality:
+            return None
+        index = self.value_indexes.get(col)
+        if index is None:
+            order = self._sort_index(col)
+            ordered = self.column(col)[order]
+            boundaries = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+            if len(boundaries) + 1 > self._value_limit():
+                self.high_cardinality.add(col)
+                debug(f"列取值过多，等值过滤使用排序索引 | 表: {self.name}, 列: {col}")
+                return None
+            index = self.value_indexes[col] = {}
+            for group in np.split(order, boundaries) if self.size else []:
+                key = self.columns[col][group[0]]
+                index[key.item() if hasattr(key, "item") else key] = group
+            debug(f"等值索引已构建 | 表: {self.name}, 列: {col}, 取值数: {len(index)}")
+        return index
+
+    def _extend_value_index(self, col: str, rows: np.ndarray) -> None:
+        """把新行并入等值索引，取值数超过上限时改用排序索引"""
+        index = self.value_indexes[col]
+        values = self.columns[col][rows]
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        boundaries = np.flatnonzero(sorted_values[1:] != sorted_values[:-1]) + 1
+        if len(index) + len(boundaries) + 1 > self._value_limit():
+            del self.value_indexes[col]
+            self.high_cardinality.add(col)
+            debug(f"列取值过多，已删除等值索引 | 表: {self.name}, 列: {col}")
+            return
+        for group in np.split(order, boundaries):
+            key = values[group[0]]
+            key = key.item() if hasattr(key, "item") else key
+            existing = index.get(key)
+            ids = rows[group]
+            index[key] = ids if existing is None else np.concatenate([existing, ids])
+
+    def _equal_rows(self, col: str, values: Sequence[Any]) -> np.ndarray:
+        """等于任一给定值的行掩码：低基数列查等值索引，其余列在排序索引上取每个值的左右边界"""
+        part = np.zeros(self.size, dtype=bool)
+        index = self._value_index(col)
+        if index is not None:
+            for item in values:
+                ids = index.get(item)
+                if ids is not None:
+                    part[ids] = True
+            return part
+        order = self._sort_index(col)
+        ordered = self.column(col)[order]
+        if ordered.dtype != object:
+            # 数值列与非数值比较会先把整列转换类型，直接视为无匹配
+            values = [item for item in values if isinstance(item, (bool, int, float))]
+        for item in values:
+            try:
+                low = np.searchsorted(ordered, item, side="left")
+                high = np.searchsorted(ordered, item, side="right")
+            except (TypeError, ValueError):  # 值与列类型不可比较，视为无匹配
+                continue
+            part[order[low:high]] = True
+        return part
+
+    @staticmethod
+    def _validate_filters(filters: Any) -> None:
+        """校验页面传入的过滤条件结构，无效时抛出DatasetError"""
+        if not isinstance(filters, (list, tuple)):
+            raise DatasetError("filters 必须是条件列表")
+        for condition in filters:
+            if not isinstance(condition, dict):
+                raise DatasetError(f"过滤条件必须是对象: {condition!r}")
+            col, op, value = condition.get("column"), condition.get("op", "eq"), condition.get("value")
+            if not isinstance(col, str):
+                raise DatasetError(f"过滤条件缺少列名: {condition!r}")
+            if op not in FILTER_OPS:
+                raise DatasetError(f"不支持的过滤运算: {op}")
+            if op == "between":
+                if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(map(_is_scalar, value)):
+                    raise DatasetError(f"between 需要两个值: {value!r}")
+            elif op == "in":
+                if not isinstance(value, (list, tuple)) or not all(map(_is_scalar, value)):
+                    raise DatasetError(f"in 需要值列表: {value!r}")
+            elif not _is_scalar(value):
+                raise DatasetError(f"{op} 需要单个值: {value!r}")
+
+    def _filter_mask(self, filters: Sequence[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """按过滤条件计算行掩码，无条件时返回None"""
+        mask = None
+        for condition in filters:
+            col, op, value = condition.get("column"), condition.get("op", "eq"), condition.get("value")
+            data = self.column(col)
+            if op in ("eq", "in"):
+                part = self._equal_rows(col, value if op == "in" else [value])
+            elif op in ("lt", "le", "gt", "ge", "between"):
+                # 范围过滤在排序索引上二分查找
+                order = self._sort_index(col)
+                ordered = data[order]
+                low, high = 0, self.size
+                if op == "between":
+                    low = np.searchsorted(ordered, value[0], side="left")
+                    high = np.searchsorted(ordered, value[1], side="right")
+                elif op in ("lt", "le"):
+                    high = np.searchsorted(ordered, value, side="left" if op == "lt" else "right")
+                else:
+                    low = np.searchsorted(ordered, value, side="right" if op == "gt" else "left")
+                part = np.zeros(self.size, dtype=bool)
+                part[order[low:high]] = True
+            else:
+                part = data != value
+            mask = part if mask is None else (mask & part)
+        return mask
+
+    def _selection(self, sort_by: Optional[str], descending: bool,
+                   filters: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """计算满足条件且已排序的行号，同一版本内相同请求复用结果"""
+        self._validate_filters(filters)
+        if sort_by is not None:
+            self.column(sort_by)
+        key = (self.version, sort_by, descending, repr(filters))
+        cached = self.selection_cache.get(key)
+        if cached is not None:
+            return cached
+
+        mask = self._filter_mask(filters)
+        if sort_by:
+            order = self._sort_index(sort_by)
+            if descending:
+                order = order[::-1]
+            selection = order if mask is None else order[mask[order]]
+        else:
+            selection = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+        if len(self.selection_cache) >= _SELECTION_CACHE_SIZE:
+            self.selection_cache.clear()
+        self.selection_cache[key] = selection
+        return selection
+
+    def query(self, offset: int = 0, length: int = 100, sort_by: Optional[str] = None,
+              descending: bool = False, filters: Sequence[Dict[str, Any]] = (),
+              columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        查询行窗口
+
+        Returns:
+            {"total": 满足条件的行数, "offset": 起始位置, "columns": 列名, "rows": 窗口内的行}
+        """
+        columns = columns or list(self.schema)
+        if not isinstance(columns, (list, tuple)):
+            raise DatasetError("columns 必须是列名列表")
+        for col in columns:
+            self.column(col)
+        with self.lock:
+            selection = self._selection(sort_by, descending, filters)
+            window = selection[max(offset, 0):max(offset, 0) + max(length, 0)]
+            data = [self.columns[col][window].tolist() for col in columns]
+            total = len(selection)
+        return {
+            "table": self.name,
+            "total": total,
+            "offset": offset,
+            "columns": columns,
+            "rows": [list(row) for row in zip(*data)],
+        }
+
+    def aggregate(self, column: str, functions: Sequence[str] = ("count", "sum", "mean", "min", "max"),
+                  filters: Sequence[Dict[str, Any]] = (), group_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        对满足条件的行做向量化聚合，可按列分组
+
+        Returns:
+            {"column": 列名, "result": {函数: 值}} 或分组时 {"groups": {分组值: {函数: 值}}}
+        """
+        if not isinstance(functions, (list, tuple)):
+            raise DatasetError("functions 必须是聚合函数列表")
+        for func in functions:
+            if func not in AGGREGATES:
+                raise DatasetError(f"不支持的聚合函数: {func}")
+        with self.lock:
+            selection = self._selection(None, False, filters)
+            values = self.column(column)[selection]
+            if group_by is None:
+                return {"column": column, "result": self._apply_aggregates(values, functions)}
+            keys = self.column(group_by)[selection]
+            groups = self._grouped_aggregates(keys, values, functions)
+        return {"column": column, "group_by": group_by, "groups": groups}
+
+    @staticmethod
+    def _grouped_aggregates(keys: np.ndarray, values: np.ndarray,
+                            functions: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """按分组键一次排序后用 ufunc.reduceat 分段归约，不逐组循环计算"""
+        if len(keys) == 0:
+            return {}
+        if values.dtype == bool:
+            values = values.astype(np.int64)
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(uniques))
+        # 按分组排列后各组连续，起点为计数的前缀和
+        ordered = values[np.argsort(inverse, kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        columns: Dict[str, list] = {}
+        sums = None
+        for func in functions:
+            if func == "count":
+                columns[func] = counts.tolist()
+            elif func in ("sum", "mean"):
+                if sums is None:
+                    sums = np.add.reduceat(ordered, starts)
+                columns[func] = (sums if func == "sum" else sums / counts).tolist()
+            elif func == "min":
+                columns[func] = np.minimum.reduceat(ordered, starts).tolist()
+            else:
+                columns[func] = np.maximum.reduceat(ordered, starts).tolist()
+        return {
+            str(key): {func: columns[func][i] for func in functions}
+            for i, key in enumerate(uniques.tolist())
+        }
+
+    @staticmethod
+    def _apply_aggregates(values: np.ndarray, functions: Sequence[str]) -> Dict[str, Any]:
+        result = {}
+        for func in functions:
+            if func == "count":
+                result[func] = int(len(values))
+            elif len(values) == 0:
+                result[func] = None
+            else:
+                value = getattr(np, func)(values)
+                result[func] = value.item() if hasattr(value, "item") else value
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        """表结构与规模"""
+        return {"table": self.name, "schema": self.schema, "rows": self.size}
+
+
+class DatasetEngine:
+    """数据集引擎：管理多张列式表，数据变化时通知监听者（如桥接对象）"""
+
+    def __init__(self):
+        self.tables: Dict[str, ColumnarTable] = {}
+        self.listeners: List[Callable[[str, int], None]] = []
+        self.lock = threading.Lock()
+
+    def create_table(self, name: str, schema: Dict[str, str]) -> ColumnarTable:
+        """创建数据表，同名表已存在时替换"""
+        table = ColumnarTable(name, schema)
+        with self.lock:
+            self.tables[name] = table
+        info(f"数据表已创建 | 表: {name}, 列: {list(schema)}")
+        self._notify(name, 0)
+        return table
+
+    def table(self, name: str) -> ColumnarTable:
+        table = self.tables.get(name)
+        if table is None:
+            raise DatasetError(f"数据表不存在: {name}")
+        return table
+
+    def append(self, name: str, rows) -> int:
+        """向表追加数据并通知监听者"""
+        size = self.table(name).append(rows)
+        self._notify(name, size)
+        return size
+
+    def drop_table(self, name: str) -> None:
+        with self.lock:
+            self.tables.pop(name, None)
+
+    def _notify(self, name: str, size: int) -> None:
+        for listener in self.listeners:
+            listener(name, size)
@@ -0,0 +1,320 @@
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit, unquote
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineDownloadRequest, QWebEngineProfile
+from utils.logger import info, error, debug
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+_DISPOSITION_FILENAME = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', re.IGNORECASE)
+
+# 允许的下载协议；地址来自页面，file:// 和 ftp:// 会让页面读取任意本地文件或访问非HTTP服务
+ALLOWED_SCHEMES = ("http", "https")
+# 只含HTTP处理器的opener，重定向到其他协议时同样失败
+_OPENER = urllib.request.OpenerDirector()
+for _handler in (urllib.request.ProxyHandler(), urllib.request.HTTPHandler(), urllib.request.HTTPSHandler(),
+                 urllib.request.HTTPRedirectHandler(), urllib.request.HTTPDefaultErrorHandler(),
+                 urllib.request.HTTPErrorProcessor(), urllib.request.UnknownHandler()):
+    _OPENER.add_handler(_handler)
+
+
+class DownloadCancelled(Exception):
+    """下载被取消或暂停"""
+
+
+class DownloadTask:
+    """单个下载任务的状态"""
+
+    def __init__(self, task_id: str, url: str, path: str, method: str = "GET",
+                 body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+                 sha256: Optional[str] = None):
+        self.id = task_id
+        self.url = url
+        self.path = path
+        self.part_path = path + ".part"
+        self.method = method
+        self.body = body
+        self.headers = headers or {}
+        self.sha256 = sha256.lower() if sha256 else None
+        self.auto_name = False  # 文件名由URL推断，可被服务器指定的文件名替换
+        self.etag: Optional[str] = None
+        self.received = 0
+        self.total = 0
+        self.state = "queued"  # queued / running / paused / finished / failed / cancelled
+        self.stop_reason: Optional[str] = None  # 请求停止时为 paused 或 cancelled
+
+
+class DownloadManager(QObject):
+    """
+    流式下载管理器：分块直接写入磁盘，并发数受限，支持基于Range的断点续传与SHA-256校验，
+    进度信号按界面帧率节流；
+    start 发起的请求不携带WebEngine的Cookie和登录状态，只适用于无需鉴权或由调用方在headers中
+    传入凭据的地址，依赖Cookie的下载应由页面直接触发（经 attach_profile 接管）
+    """
+
+    # 信号定义（字节数使用浮点数，避免超过2GB时整数溢出）
+    progress = pyqtSignal(str, float, float)  # 任务ID, 已接收, 总大小（未知为0）
+    finished = pyqtSignal(str, str)  # 任务ID, 文件路径
+    failed = pyqtSignal(str, str)  # 任务ID, 错误信息
+    state_changed = pyqtSignal(str, str)  # 任务ID, 状态
+
+    def __init__(self, download_dir: str, max_concurrent: int = 3, progress_hz: float = 60.0,
+                 chunk_size: int = 256 * 1024, timeout: float = 30.0, parent: QObject = None):
+        super().__init__(parent)
+        self.download_dir = download_dir
+        self.progress_interval = 1.0 / progress_hz if progress_hz > 0 else 0.0
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.tasks: Dict[str, DownloadTask] = {}
+        self.web_downloads: Dict[str, QWebEngineDownloadRequest] = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="download")
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def start(self, url: str, filename: Optional[str] = None, method: str = "GET",
+              body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+              sha256: Optional[str] = None) -> str:
+        """
+        开始下载
+
+        Args:
+            url: 下载地址，只支持http/https
+            filename: 保存的文件名，默认取URL路径的最后一段
+            method: 请求方法，导出类接口可使用POST
+            body: 请求体
+            headers: 请求头
+            sha256: 期望的SHA-256校验值，下载完成后校验
+
+        Returns:
+            任务ID
+
+        Raises:
+            ValueError: 地址不是http/https
+        """
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in ALLOWED_SCHEMES or not parts.netloc:
+            raise ValueError(f"不支持的下载地址: {url}")
+        task_id = f"dl-{next(self._ids)}"
+        name = os.path.basename(filename or unquote(parts.path)) or task_id
+        task = DownloadTask(task_id, url, "", method.upper(), body, headers, sha256)
+        task.auto_name = not filename
+        self._assign_path(task, os.path.join(self.download_dir, name))
+        info(f"下载任务创建 | ID: {task_id}, URL: {url}, 保存: {task.path}")
+        self._submit(task)
+        return task_id
+
+    def pause(self, task_id: str) -> bool:
+        """暂停下载，已下载部分保留用于续传"""
+        return self._request_stop(task_id, "paused")
+
+    def cancel(self, task_id: str) -> bool:
+        """取消下载并删除临时文件"""
+        web = self.web_downloads.get(task_id)
+        if web is not None:
+            web.cancel()
+            return True
+        return self._request_stop(task_id, "cancelled")
+
+    def resume(self, task_id: str) -> bool:
+        """从已下载的位置继续下载"""
+        web = self.web_downloads.get(task_id)
+        if web is not None:
+            if web.state() == QWebEngineDownloadRequest.DownloadState.DownloadInterrupted:
+                web.resume()
+                return True
+            return False
+        task = self.tasks.get(task_id)
+        if task is None or task.state not in ("paused", "failed"):
+            return False
+        self._submit(task)
+        return True
+
+    def attach_profile(self, profile: QWebEngineProfile) -> None:
+        """接管WebEngine配置中由页面触发的下载"""
+        profile.downloadRequested.connect(self.on_download_requested)
+
+    def on_download_requested(self, request: QWebEngineDownloadRequest) -> None:
+        """页面触发的下载：由Chromium直接写入下载目录，进度按帧率节流后转发"""
+        task_id = f"web-{next(self._ids)}"
+        request.setDownloadDirectory(self.download_dir)
+        self.web_downloads[task_id] = request
+        last_emit = [0.0]
+
+        def on_received():
+            now = time.monotonic()
+            if now - last_emit[0] >= self.progress_interval:
+                last_emit[0] = now
+                self.progress.emit(task_id, float(request.receivedBytes()), float(max(request.totalBytes(), 0)))
+
+        def on_state(state):
+            states = QWebEngineDownloadRequest.DownloadState
+            if state == states.DownloadCompleted:
+                path = os.path.join(request.downloadDirectory(), request.downloadFileName())
+                self.progress.emit(task_id, float(request.receivedBytes()), float(request.receivedBytes()))
+                self.finished.emit(task_id, path)
+                self.web_downloads.pop(task_id, None)
+                info(f"页面下载完成 | ID: {task_id}, 文件: {path}")
+            elif state == states.DownloadCancelled:
+                self.state_changed.emit(task_id, "cancelled")
+                self.web_downloads.pop(task_id, None)
+            elif state == states.DownloadInterrupted:
+                # 保留请求对象以便续传
+                self.failed.emit(task_id, request.interruptReasonString())
+
+        request.receivedBytesChanged.connect(on_received)
+        request.stateChanged.connect(on_state)
+        request.accept()
+        info(f"页面下载开始 | ID: {task_id}, URL: {request.url().toString()}")
+
+    def shutdown(self) -> None:
+        """停止所有下载，未完成的保留临时文件"""
+        with self.lock:
+            for task in self.tasks.values():
+                if task.state in ("queued", "running"):
+                    task.stop_reason = "paused"
+        self.executor.shutdown(wait=False)
+
+    def _submit(self, task: DownloadTask) -> None:
+        task.stop_reason = None
+        self._set_state(task, "queued")
+        self.executor.submit(self._run, task)
+
+    def _request_stop(self, task_id: str, reason: str) -> bool:
+        task = self.tasks.get(task_id)
+        if task is None or task.state in ("finished", "cancelled"):
+            return False
+        if task.state in ("queued", "running"):
+            task.stop_reason = reason
+        else:
+            self._finish_stop(task, reason)
+        return True
+
+    def _run(self, task: DownloadTask) -> None:
+        """工作线程：流式下载到临时文件，完成后校验并改名"""
+        if task.stop_reason:
+            self._finish_stop(task, task.stop_reason)
+            return
+        self._set_state(task, "running")
+        try:
+            self._download(task)
+            if task.sha256:
+                actual = self._file_sha256(task.part_path)
+                if actual != task.sha256:
+                    os.remove(task.part_path)
+                    raise ValueError(f"SHA-256校验失败: 期望 {task.sha256}, 实际 {actual}")
+            os.replace(task.part_path, task.path)
+        except DownloadCancelled:
+            self._finish_stop(task, task.stop_reason or "cancelled")
+            return
+        except (HTTPError, URLError, OSError, ValueError) as e:
+            error(f"下载失败 | ID: {task.id}, 错误: {str(e)}")
+            self._set_state(task, "failed")
+            self.failed.emit(task.id, str(e))
+            return
+        except Exception as e:
+            # 其余异常同样结束任务，避免任务永远停留在 running
+            error(f"下载异常 | ID: {task.id}, 错误: {str(e)}", exc_info=True)
+            self._set_state(task, "failed")
+            self.failed.emit(task.id, str(e))
+            return
+        self._set_state(task, "finished")
+        self.progress.emit(task.id, float(task.received), float(task.received))
+        self.finished.emit(task.id, task.path)
+        info(f"下载完成 | ID: {task.id}, 大小: {task.received}, 文件: {task.path}")
+
+    def _download(self, task: DownloadTask) -> None:
+        offset = os.path.getsize(task.part_path) if os.path.exists(task.part_path) else 0
+        headers = dict(task.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if task.etag:
+                headers["If-Range"] = task.etag
+        request = urllib.request.Request(task.url, data=task.body, headers=headers, method=task.method)
+
+        with _OPENER.open(request, timeout=self.timeout) as resp:
+            task.etag = resp.headers.get("ETag") or task.etag
+            if offset and resp.status == 206:
+                match = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+                if not match or int(match.group(1)) != offset:
+                    raise ValueError("服务器返回的Content-Range与续传位置不符")
+                task.total = int(match.group(3)) if match.group(3) != "*" else 0
+                mode = "ab"
+                debug(f"断点续传 | ID: {task.id}, 起始: {offset}")
+            else:
+                # 服务器不支持Range时从头下载
+                offset = 0
+                task.total = int(resp.headers.get("Content-Length") or 0)
+                mode = "wb"
+                self._adopt_server_filename(task, resp.headers.get("Content-Disposition"))
+
+            task.received = offset
+            last_emit = 0.0
+            with open(task.part_path, mode) as f:
+                while True:
+                    if task.stop_reason:
+                        raise DownloadCancelled()
+                    chunk = resp.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    task.received += len(chunk)
+                    now = time.monotonic()
+                    if now - last_emit >= self.progress_interval:
+                        last_emit = now
+                        self.progress.emit(task.id, float(task.received), float(task.total))
+        if task.total and task.received != task.total:
+            raise OSError(f"下载不完整: {task.received}/{task.total}")
+
+    def _adopt_server_filename(self, task: DownloadTask, disposition: Optional[str]) -> None:
+        """未指定文件名时使用服务器 Content-Disposition 中的文件名"""
+        if not disposition or not task.auto_name or os.path.exists(task.part_path):
+            return
+        match = _DISPOSITION_FILENAME.search(disposition)
+        if match:
+            self._assign_path(task, os.path.join(self.download_dir, os.path.basename(unquote(match.group(1)))))
+
+    def _finish_stop(self, task: DownloadTask, reason: str) -> None:
+        if reason == "cancelled" and os.path.exists(task.part_path):
+            os.remove(task.part_path)
+        self._set_state(task, reason)
+        info(f"下载{'已暂停' if reason == 'paused' else '已取消'} | ID: {task.id}, 已接收: {task.received}")
+
+    def _set_state(self, task: DownloadTask, state: str) -> None:
+        task.state = state
+        self.state_changed.emit(task.id, state)
+
+    def _assign_path(self, task: DownloadTask, path: str) -> None:
+        """
+        选出不冲突的保存路径并登记任务；选择与登记在同一锁内完成，
+        GUI线程新建任务与工作线程采用服务器文件名时不会选中同一文件
+        """
+        with self.lock:
+            task.path = self._unique_path(path)
+            task.part_path = task.path + ".part"
+            self.tasks[task.id] = task
+
+    def _unique_path(self, path: str) -> str:
+        """目标文件或其他任务已占用时追加序号，调用方需持有 self.lock"""
+        base, ext = os.path.splitext(path)
+        candidate, index = path, 1
+        taken = {task.path for task in self.tasks.values()}
+        while os.path.exists(candidate) or candidate in taken:
+            candidate = f"{base} ({index}){ext}"
+            index += 1
+        return candidate
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
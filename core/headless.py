@@ -0,0 +1,126 @@
+import os
+import sys
+from typing import Any, Optional
+from PyQt6.QtCore import QUrl, QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
+from config.settings import AppConfig
+from config.profile import PerformanceProfile
+from core.bridge import Bridge
+from core.js_evaluator import JsEvaluator
+from core.page_scripts import install_bridge_scripts
+from core.server import HTTPServerManager
+from core.proxy_cache import CachingProxy
+from utils.resource_manager import ResourceManager
+from utils.port_manager import PortManager
+from utils.logger import info, error
+
+class HeadlessSession:
+    """
+    无窗口会话：启动内嵌服务器并在离屏页面中加载Vue应用，供Python脚本执行页面侧计算
+
+    用法:
+        with HeadlessSession() as session:
+            result = session.call("webCalculator.performCalculation", 55, 3)
+    """
+
+    def __init__(self, load_timeout_ms: int = 15000):
+        # 离屏平台必须在创建QApplication前设置，只在使用离屏会话时修改环境
+        if QApplication.instance() is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        self.load_timeout_ms = load_timeout_ms
+        self.app: Optional[QApplication] = None
+        self.server_manager: Optional[HTTPServerManager] = None
+        self.profile: Optional[QWebEngineProfile] = None
+        self.page: Optional[QWebEnginePage] = None
+        self.bridge: Optional[Bridge] = None
+        self.evaluator: Optional[JsEvaluator] = None
+
+    def __enter__(self) -> "HeadlessSession":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """启动服务器并加载页面，页面加载失败或超时抛出RuntimeError"""
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+
+        vue_dir = ResourceManager.get_path(AppConfig.VUE_DIST_PATH)
+        port = PortManager.find_available_port(AppConfig.DEFAULT_PORT)
+        if not port:
+            raise RuntimeError("无法找到可用端口")
+        profile = PerformanceProfile.active()
+        self.server_manager = HTTPServerManager(
+            port, vue_dir,
+            max_workers=profile.get("server_workers"),
+            request_queue=profile.get("server_request_queue"),
+            proxy=CachingProxy.from_profile(profile, ResourceManager.get_cache_dir()),
+            preload_hints=profile.get("preload_hints")
+        )
+        started = self._wait_for(
+            self.server_manager.signals.started, self.server_manager.start,
+            fail_signal=self.server_manager.signals.failed
+        )
+        if not started:
+            raise RuntimeError(f"HTTP服务器启动失败 | 目录: {vue_dir}")
+
+        # 离屏页面使用独立的无痕配置，不影响窗口模式的缓存
+        self.profile = QWebEngineProfile(self.app)
+        self.page = QWebEnginePage(self.profile, self.app)
+        self.bridge = Bridge(self.app)
+        install_bridge_scripts(self.page)
+        self.bridge.setup_channel(self.page)
+        self.evaluator = JsEvaluator(self.page, self.bridge)
+
+        url = QUrl(f"http://localhost:{port}/{AppConfig.HTML_ENTRY}?window=headless#/")
+        loaded = self._wait_for(self.page.loadFinished, lambda: self.page.load(url))
+        if not loaded:
+            self.stop()
+            raise RuntimeError(f"离屏页面加载失败 | URL: {url.toString()}")
+        info(f"离屏会话已就绪 | URL: {url.toString()}")
+
+    def call(self, target: str, *args, timeout_ms: Optional[int] = None) -> Any:
+        """同步调用页面函数并返回结果"""
+        return JsEvaluator.wait(self.evaluator.call(target, *args, timeout_ms=timeout_ms), timeout_ms)
+
+    def evaluate(self, expression: str, timeout_ms: Optional[int] = None) -> Any:
+        """同步求值页面表达式并返回结果"""
+        return JsEvaluator.wait(self.evaluator.evaluate(expression, timeout_ms=timeout_ms), timeout_ms)
+
+    def stop(self) -> None:
+        """释放页面并停止服务器"""
+        if self.evaluator:
+            self.evaluator.cancel_all()
+            self.evaluator = None
+        if self.page:
+            self.page.deleteLater()
+            self.page = None
+        if self.server_manager:
+            self.server_manager.stop()
+            self.server_manager = None
+
+    def _wait_for(self, signal, trigger, fail_signal=None) -> bool:
+        """触发操作并在事件循环中等待信号，返回信号携带的成功状态"""
+        loop = QEventLoop()
+        outcome = {"ok": False}
+
+        def on_signal(*args):
+            outcome["ok"] = args[0] is not False if args else True
+            loop.quit()
+
+        signal.connect(on_signal)
+        if fail_signal is not None:
+            fail_signal.connect(loop.quit)
+        QTimer.singleShot(self.load_timeout_ms, loop.quit)
+        try:
+            trigger()
+            loop.exec()
+        except Exception as e:
+            error(f"离屏会话等待失败: {str(e)}")
+        finally:
+            signal.disconnect(on_signal)
+            if fail_signal is not None:
+                fail_signal.disconnect(loop.quit)
+        return outcome["ok"]
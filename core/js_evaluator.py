@@ -0,0 +1,210 @@
+import itertools
+import json
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, List, Optional
+from PyQt6.QtCore import QObject, QTimer, QEventLoop
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from config.settings import AppConfig
+from core.bridge import Bridge
+from utils import metrics
+from utils.logger import debug, warning
+
+# Python发起调用到页面结果经桥接回传的往返耗时
+_call_latency = metrics.histogram("bridge.js_call_ms")
+
+# 批量执行脚本：逐个执行调用（支持返回Promise），全部完成后经桥接一次性回传结果
+_BATCH_SCRIPT = """
+(function (calls) {
+  var ready = window.qtBridgeReady;
+  if (!ready) {
+    return 'bridge-unavailable';
+  }
+  var run = function (call) {
+    if (call.kind === 'eval') {
+      return (0, eval)(call.target);
+    }
+    var parts = call.target.split('.');
+    var owner = window;
+    for (var i = 0; i < parts.length - 1; i++) {
+      owner = owner[parts[i]];
+    }
+    var fn = owner ? owner[parts[parts.length - 1]] : undefined;
+    if (typeof fn !== 'function') {
+      throw new TypeError(call.target + ' is not a function');
+    }
+    return fn.apply(owner, call.args);
+  };
+  var settled = calls.map(function (call) {
+    return Promise.resolve().then(function () { return run(call); }).then(
+      function (value) {
+        value = value === undefined ? null : value;
+        try {
+          JSON.stringify(value);
+          return { id: call.id, ok: true, value: value };
+        } catch (e) {
+          return { id: call.id, ok: false, error: 'result is not JSON serializable' };
+        }
+      },
+      function (err) {
+        return { id: call.id, ok: false, error: String(err && err.message ? err.message : err) };
+      }
+    );
+  });
+  Promise.all(settled).then(function (results) {
+    ready.then(function (bridge) { bridge.resolveJsCalls(JSON.stringify(results)); });
+  });
+  return 'ok';
+})(%s)
+"""
+
+class JsCallError(RuntimeError):
+    """页面侧调用抛出异常或无法执行"""
+
+
+class JsEvaluator(QObject):
+    """可等待的JavaScript执行器：调用返回Future，同一事件循环周期内的调用合并为一次runJavaScript"""
+
+    # 调用ID全局唯一，多个页面共用桥接中心时各执行器只处理自己的结果
+    _ids = itertools.count(1)
+
+    def __init__(self, page: QWebEnginePage, bridge: Bridge, parent: QObject = None):
+        super().__init__(parent)
+        self.page = page
+        self.bridge = bridge
+        self.queue: List[Dict[str, Any]] = []
+        self.pending: Dict[int, Future] = {}
+        self.started: Dict[int, float] = {}  # 调用ID -> 发起时间
+        self.timers: Dict[int, QTimer] = {}  # 调用ID -> 超时定时器，调用完成时停止
+        self.flush_scheduled = False
+        bridge.jsCallsResolved.connect(self.on_results)
+
+    def call(self, target: str, *args, timeout_ms: Optional[int] = None) -> Future:
+        """
+        调用页面上的函数
+
+        Args:
+            target: 以 window 为根的函数路径，如 "webCalculator.performCalculation"
+            *args: 可JSON序列化的参数
+            timeout_ms: 超时时间，默认 AppConfig.JS_CALL_TIMEOUT_MS
+
+        Returns:
+            结果Future，函数返回Promise时为其解析值
+        """
+        return self._enqueue("call", target, list(args), timeout_ms)
+
+    def evaluate(self, expression: str, timeout_ms: Optional[int] = None) -> Future:
+        """在页面全局作用域中求值表达式，返回结果Future"""
+        return self._enqueue("eval", expression, [], timeout_ms)
+
+    def _enqueue(self, kind: str, target: str, args: list, timeout_ms: Optional[int]) -> Future:
+        """登记调用并安排在本轮事件循环结束后批量发送"""
+        call_id = next(self._ids)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.pending[call_id] = future
+        self.started[call_id] = time.perf_counter()
+        self.queue.append({"id": call_id, "kind": kind, "target": target, "args": args})
+
+        timeout_ms = AppConfig.JS_CALL_TIMEOUT_MS if timeout_ms is None else timeout_ms
+        if timeout_ms > 0:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(partial(self._expire, call_id, timeout_ms))
+            timer.start(timeout_ms)
+            self.timers[call_id] = timer
+
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            QTimer.singleShot(0, self.flush)
+        return future
+
+    def flush(self) -> None:
+        """将排队的调用合并为一次runJavaScript发送"""
+        self.flush_scheduled = False
+        calls, self.queue = self.queue, []
+        if not calls:
+            return
+        debug(f"批量执行JavaScript | 调用数: {len(calls)}")
+        ids = [call["id"] for call in calls]
+        self.page.runJavaScript(
+            _BATCH_SCRIPT % json.dumps(calls, ensure_ascii=False),
+            partial(self._on_batch_started, ids)
+        )
+
+    def _on_batch_started(self, ids: List[int], status) -> None:
+        """批量脚本同步返回：桥接未就绪或脚本未执行时整批失败"""
+        if status == "ok":
+            return
+        reason = "桥接未就绪" if status == "bridge-unavailable" else "脚本未执行"
+        for call_id in ids:
+            self._settle(call_id, error=JsCallError(reason))
+
+    def on_results(self, payload: str) -> None:
+        """接收页面回传的批量结果"""
+        try:
+            results = json.loads(payload)
+        except ValueError:
+            warning("JavaScript结果解析失败")
+            return
+        for result in results:
+            call_id = result.get("id")
+            if call_id not in self.pending:
+                continue
+            _call_latency.observe((time.perf_counter() - self.started[call_id]) * 1000.0)
+            if result.get("ok"):
+                self._settle(call_id, value=result.get("value"))
+            else:
+                self._settle(call_id, error=JsCallError(result.get("error", "未知错误")))
+
+    def _expire(self, call_id: int, timeout_ms: int) -> None:
+        """调用超时"""
+        self._settle(call_id, error=TimeoutError(f"JavaScript调用超时 ({timeout_ms}ms)"))
+
+    def _settle(self, call_id: int, value: Any = None, error: Optional[Exception] = None) -> None:
+        """完成Future，已完成或已超时的调用忽略"""
+        future = self.pending.pop(call_id, None)
+        self.started.pop(call_id, None)
+        timer = self.timers.pop(call_id, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def cancel_all(self, reason: str = "执行器已关闭") -> None:
+        """使所有未完成调用失败"""
+        self.queue = []
+        for call_id in list(self.pending):
+            self._settle(call_id, error=JsCallError(reason))
+
+    @staticmethod
+    def wait(future: Future, timeout_ms: Optional[int] = None) -> Any:
+        """
+        在Qt事件循环中等待Future完成并返回结果，供脚本同步使用
+
+        Args:
+            future: call/evaluate 返回的Future
+            timeout_ms: 最长等待时间，未指定或不大于0时使用 AppConfig.JS_CALL_TIMEOUT_MS，
+                        保证调用本身未设超时时也不会永久阻塞
+        """
+        if timeout_ms is None or timeout_ms <= 0:
+            timeout_ms = AppConfig.JS_CALL_TIMEOUT_MS
+        if not future.done():
+            loop = QEventLoop()
+            future.add_done_callback(lambda _: loop.quit())
+            timer = QTimer()
+            timer.setSingleShot(True)
+            timer.timeout.connect(loop.quit)
+            timer.start(timeout_ms)
+            if not future.done():
+                loop.exec()
+            timer.stop()
+            if not future.done():
+                raise TimeoutError(f"等待JavaScript结果超时 ({timeout_ms}ms)")
+        return future.result()
@@ -0,0 +1,58 @@
+from PyQt6.QtCore import QFile, QIODevice
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineScript
+from utils.logger import debug
+
+# Qt内置的qwebchannel.js资源路径
+QWEBCHANNEL_RESOURCE = ":/qtwebchannel/qwebchannel.js"
+
+# 桥接引导脚本：页面在load()前已绑定WebChannel，文档创建时 qt.webChannelTransport 同步可用，
+# 直接创建一次QWebChannel，并通过 window.qtBridgeReady 暴露就绪Promise
+# （页面未绑定WebChannel时不定义 qtBridgeReady，页面据此判断不在Qt中运行）
+BRIDGE_BOOTSTRAP = """
+(function () {
+  if (window.qtBridgeReady || !window.qt || !window.qt.webChannelTransport) {
+    return;
+  }
+  window.qtBridgeReady = new Promise(function (resolve) {
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+      window.bridge = channel.objects.bridge;
+      window.windowBridge = channel.objects.window || null;
+      resolve(window.bridge);
+    });
+  });
+})();
+"""
+
+_qwebchannel_source = None
+
+def qwebchannel_source() -> str:
+    """读取Qt内置的qwebchannel.js源码，资源缺失时抛出RuntimeError（注入空脚本会让桥接静默失效）"""
+    global _qwebchannel_source
+    if _qwebchannel_source is None:
+        resource = QFile(QWEBCHANNEL_RESOURCE)
+        if not resource.open(QIODevice.OpenModeFlag.ReadOnly):
+            raise RuntimeError(f"无法读取qwebchannel.js | 路径: {QWEBCHANNEL_RESOURCE}")
+        source = bytes(resource.readAll()).decode("utf-8")
+        resource.close()
+        if not source.strip():
+            raise RuntimeError(f"qwebchannel.js内容为空 | 路径: {QWEBCHANNEL_RESOURCE}")
+        _qwebchannel_source = source
+    return _qwebchannel_source
+
+def install_bridge_scripts(page: QWebEnginePage) -> None:
+    """在文档创建时向页面注入qwebchannel.js和桥接引导脚本"""
+    scripts = page.scripts()
+    for name, source in (
+        ("qwebchannel", qwebchannel_source()),
+        ("bridge-bootstrap", BRIDGE_BOOTSTRAP),
+    ):
+        if scripts.find(name):
+            continue
+        script = QWebEngineScript()
+        script.setName(name)
+        script.setSourceCode(source)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+    debug("桥接脚本已注入页面")
@@ -0,0 +1,120 @@
+import json
+import os
+from typing import Dict, List, Optional, Set
+from utils.logger import info, warning, debug
+
+# Vite构建清单位置（Vite 5+ 位于 .vite 目录，旧版本位于根目录）
+MANIFEST_CANDIDATES = (".vite/manifest.json", "manifest.json")
+
+_FONT_EXTENSIONS = (".woff2", ".woff", ".ttf", ".otf")
+_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif")
+
+
+class PreloadManifest:
+    """根据Vite构建清单计算入口资源的依赖图，生成预加载提示"""
+
+    def __init__(self, dist_dir: str):
+        self.dist_dir = dist_dir
+        self.manifest: Dict[str, dict] = {}
+        self.critical: List[str] = []  # 入口静态依赖（首屏必需）
+        self.deferred: List[str] = []  # 仅动态导入可达的资源（懒加载路由）
+
+    @classmethod
+    def load(cls, dist_dir: str) -> Optional["PreloadManifest"]:
+        """读取构建清单，不存在或格式错误时返回None"""
+        for candidate in MANIFEST_CANDIDATES:
+            path = os.path.join(dist_dir, candidate)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                warning(f"构建清单读取失败 | 路径: {path}, 错误: {str(e)}")
+                return None
+            preload = cls(dist_dir)
+            preload.manifest = manifest
+            preload._build_graph()
+            info(f"构建清单已加载 | 关键资源: {len(preload.critical)}, 懒加载资源: {len(preload.deferred)}")
+            return preload
+        debug(f"未找到构建清单 | 目录: {dist_dir}")
+        return None
+
+    def _build_graph(self) -> None:
+        """从入口出发沿静态导入收集关键资源，再沿动态导入收集懒加载资源"""
+        entries = [key for key, chunk in self.manifest.items() if chunk.get("isEntry")]
+        critical_keys: Set[str] = set()
+        stack = list(entries)
+        while stack:
+            key = stack.pop()
+            if key in critical_keys or key not in self.manifest:
+                continue
+            critical_keys.add(key)
+            stack.extend(self.manifest[key].get("imports", []))
+
+        deferred_keys: Set[str] = set()
+        stack = [dyn for key in critical_keys for dyn in self.manifest[key].get("dynamicImports", [])]
+        while stack:
+            key = stack.pop()
+            if key in critical_keys or key in deferred_keys or key not in self.manifest:
+                continue
+            deferred_keys.add(key)
+            chunk = self.manifest[key]
+            stack.extend(chunk.get("imports", []) + chunk.get("dynamicImports", []))
+
+        # 入口自身的JS由index.html直接引用，不需要重复预加载
+        entry_files = {self.manifest[key]["file"] for key in entries}
+        self.critical = self._files(critical_keys, exclude=entry_files)
+        self.deferred = [f for f in self._files(deferred_keys) if f not in self.critical]
+
+    def _files(self, keys: Set[str], exclude: Set[str] = frozenset()) -> List[str]:
+        """收集分块的JS、CSS和静态资源文件，CSS和字体排在前面"""
+        files: List[str] = []
+        for key in sorted(keys):
+            chunk = self.manifest[key]
+            for name in chunk.get("css", []) + chunk.get("assets", []) + [chunk.get("file")]:
+                if name and name not in files and name not in exclude and not name.endswith(".html"):
+                    files.append(name)
+        return sorted(files, key=lambda name: (not name.endswith(".css"), not name.endswith(_FONT_EXTENSIONS)))
+
+    @staticmethod
+    def link_value(name: str, rel: str = "preload") -> str:
+        """生成单个资源的Link头值"""
+        url = "/" + name.lstrip("/")
+        if name.endswith((".js", ".mjs")):
+            return f"<{url}>; rel=modulepreload" if rel == "preload" else f"<{url}>; rel={rel}"
+        if name.endswith(".css"):
+            # Vite的入口页面以 crossorigin 加载样式表，预加载的凭据模式必须一致才能被复用
+            return f"<{url}>; rel={rel}; as=style; crossorigin"
+        if name.endswith(_FONT_EXTENSIONS):
+            return f"<{url}>; rel={rel}; as=font; crossorigin"
+        if name.endswith(_IMAGE_EXTENSIONS):
+            return f"<{url}>; rel={rel}; as=image"
+        return f"<{url}>; rel={rel}"
+
+    def link_headers(self) -> List[str]:
+        """入口页面响应附带的Link头（关键资源）"""
+        return [self.link_value(name) for name in self.critical]
+
+    def warmup_html(self) -> str:
+        """缓存预热页面：预加载关键资源并预取懒加载资源"""
+        tags = []
+        for name in self.critical:
+            tags.append(self._link_tag(name, "modulepreload" if name.endswith((".js", ".mjs")) else "preload"))
+        for name in self.deferred:
+            tags.append(self._link_tag(name, "prefetch"))
+        return "<!doctype html><html><head>{}</head><body></body></html>".format("".join(tags))
+
+    def _link_tag(self, name: str, rel: str) -> str:
+        url = "/" + name.lstrip("/")
+        attrs = f'rel="{rel}" href="{url}"'
+        if rel == "preload":
+            if name.endswith(".css"):
+                attrs += ' as="style" crossorigin'
+            elif name.endswith(_FONT_EXTENSIONS):
+                attrs += ' as="font" crossorigin'
+            elif name.endswith(_IMAGE_EXTENSIONS):
+                attrs += ' as="image"'
+            else:
+                attrs += ' as="fetch" crossorigin'
+        return f"<link {attrs}>"
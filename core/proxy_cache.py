@@ -0,0 +1,415 @@
+import hashlib
+import http.client
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from utils.logger import info, warning, debug
+
+# 不转发的逐跳头
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "content-length", "host",
+}
+
+# 参与缓存键的请求头：同一地址按内容协商结果分别缓存
+VARY_HEADERS = ("accept", "accept-encoding")
+
+Headers = List[Tuple[str, str]]
+
+
+class CachedResponse:
+    """缓存的上游响应"""
+
+    def __init__(self, status: int, headers: Headers, body: bytes, stored_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class StreamedResponse:
+    """未缓冲的上游响应：响应体边读边写给客户端，用于不缓存或超过缓冲上限的响应"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, pool: "UpstreamPool", conn: http.client.HTTPConnection,
+                 resp: http.client.HTTPResponse, headers: Headers, prefix: bytes = b""):
+        self.pool = pool
+        self.conn = conn
+        self.resp = resp
+        self.status = resp.status
+        self.headers = headers
+        self.prefix = prefix  # 判断大小时已读出的开头部分
+        self.length = resp.length  # 上游未给出Content-Length时为None
+
+    def write_to(self, wfile) -> int:
+        """把响应体分块写入输出流，完成后归还连接，返回写入字节数"""
+        sent = 0
+        try:
+            if self.prefix:
+                wfile.write(self.prefix)
+                sent += len(self.prefix)
+            while True:
+                chunk = self.resp.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                wfile.write(chunk)
+                sent += len(chunk)
+        finally:
+            self.close()
+        return sent
+
+    def close(self) -> None:
+        """归还连接，响应体未读完时关闭连接"""
+        if self.conn is not None:
+            conn, self.conn = self.conn, None
+            self.pool.release(conn, self.resp)
+
+
+class ResponseStore:
+    """基于SQLite的响应存储，超出容量时按最近访问时间淘汰"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB,"
+            " size INTEGER, stored_at REAL, accessed_at REAL)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """读取缓存并刷新访问时间"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+        status, headers, body, stored_at = row
+        return CachedResponse(status, [tuple(h) for h in json.loads(headers)], bytes(body), stored_at)
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        """写入缓存，单个响应超过容量上限时不缓存"""
+        size = len(response.body)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status, json.dumps(response.headers), response.body,
+                 size, response.stored_at, time.time())
+            )
+            self._prune()
+            self.conn.commit()
+
+    def _prune(self) -> None:
+        """淘汰最久未访问的响应直到总大小不超过上限"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        debug(f"代理缓存淘汰 | 数量: {len(evicted)}")
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class UpstreamPool:
+    """上游服务器的HTTP长连接池"""
+
+    def __init__(self, base_url: str, size: int, timeout: float):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"无效的上游地址: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def open(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]):
+        """
+        发送请求并读取响应头，空闲连接被上游关闭时换新连接重试一次；
+        响应体由调用方读取，之后调用 release 归还连接
+
+        Returns:
+            (连接, 响应)
+        """
+        for attempt in range(2):
+            try:
+                conn = self.idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._connect()
+                reused = False
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+        raise OSError("上游连接失败")
+
+    def release(self, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        """响应体已读完且上游保持连接时放回连接池，否则关闭"""
+        if not resp.isclosed() or resp.will_close:
+            conn.close()
+            return
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _Flight:
+    """进行中的上游请求，相同请求的并发调用共享其结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[CachedResponse] = None
+        self.error: Optional[Exception] = None
+
+
+class CachingProxy:
+    """
+    缓存反向代理：按路径前缀转发到上游，
+    新鲜期内直接命中，过期后在 stale-while-revalidate 窗口内先返回旧响应再后台刷新，
+    上游不可用或返回5xx时回退到任意旧响应（离线可用）；
+    只缓存GET和显式声明为只读查询的POST路径，带Authorization或Cookie的请求不缓存；
+    不缓存的响应和超过缓冲上限的响应不读入内存，直接流式转发
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, str],
+        store: ResponseStore,
+        ttl: float,
+        stale_while_revalidate: float,
+        pool_size: int = 4,
+        timeout: float = 10.0,
+        cacheable_posts: Optional[List[str]] = None,
+        max_buffer_bytes: int = 8 * 1024 * 1024
+    ):
+        # 前缀按长度降序匹配
+        self.routes = sorted(
+            ((prefix, UpstreamPool(url, pool_size, timeout)) for prefix, url in routes.items()),
+            key=lambda item: len(item[0]), reverse=True
+        )
+        self.store = store
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self.cacheable_posts = tuple(cacheable_posts or ())  # 可缓存的只读POST路径前缀
+        self.max_buffer_bytes = max_buffer_bytes  # Content-Length超过此值的响应流式转发且不缓存
+        self.inflight: Dict[str, _Flight] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_profile(cls, profile, cache_dir: str) -> Optional["CachingProxy"]:
+        """根据性能配置创建代理，未配置上游时返回None"""
+        routes = profile.get("proxy_routes")
+        if not routes:
+            return None
+        path = profile.get("proxy_cache_path") or os.path.join(cache_dir, "proxy_cache.sqlite3")
+        store = ResponseStore(path, profile.get("proxy_cache_mb") * 1024 * 1024)
+        info(f"缓存代理已启用 | 路由: {routes}, 存储: {path}")
+        return cls(
+            routes, store,
+            ttl=profile.get("proxy_ttl_s"),
+            stale_while_revalidate=profile.get("proxy_swr_s"),
+            pool_size=profile.get("proxy_pool_size"),
+            timeout=profile.get("proxy_timeout_s"),
+            cacheable_posts=profile.get("proxy_cacheable_posts"),
+            max_buffer_bytes=profile.get("proxy_max_buffer_mb") * 1024 * 1024
+        )
+
+    def match(self, path: str) -> Optional[UpstreamPool]:
+        """查找路径对应的上游"""
+        for prefix, pool in self.routes:
+            if path.startswith(prefix):
+                return pool
+        return None
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes]):
+        """
+        处理代理请求
+
+        Returns:
+            (响应, 缓存状态)，缓存状态为 HIT / STALE / MISS / BYPASS；
+            响应为 CachedResponse，或需由调用方 write_to/close 的 StreamedResponse
+        """
+        pool = self.match(path)
+        forward_headers = {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+        if not self._is_cacheable(method, path, headers):
+            return self._fetch(pool, method, path, forward_headers, body, stream=True), "BYPASS"
+
+        key = self._cache_key(method, path, forward_headers, body)
+        cached = self.store.get(key)
+        if cached is not None:
+            age = cached.age()
+            if age < self.ttl:
+                return cached, "HIT"
+            if age < self.ttl + self.stale_while_revalidate:
+                self._revalidate_async(key, pool, method, path, forward_headers, body)
+                return cached, "STALE"
+
+        try:
+            response = self._fetch_coalesced(key, pool, method, path, forward_headers, body)
+        except (OSError, http.client.HTTPException) as e:
+            if cached is not None:
+                warning(f"上游不可用，返回旧缓存 | 路径: {path}, 错误: {str(e)}")
+                return cached, "STALE"
+            raise
+        if response.status >= 500 and cached is not None:
+            warning(f"上游返回错误，返回旧缓存 | 路径: {path}, 状态码: {response.status}")
+            if isinstance(response, StreamedResponse):
+                response.close()
+            return cached, "STALE"
+        return response, "MISS"
+
+    def _is_cacheable(self, method: str, path: str, headers: Dict[str, str]) -> bool:
+        """GET和声明为只读的POST可缓存；带凭据或会话的请求响应因用户而异，不缓存也不合并"""
+        if any(name.lower() in ("authorization", "cookie") for name in headers):
+            return False
+        if method == "GET":
+            return True
+        return method == "POST" and any(path.startswith(prefix) for prefix in self.cacheable_posts)
+
+    def _cache_key(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes]) -> str:
+        lowered = {name.lower(): value for name, value in headers.items()}
+        vary = "\n".join(f"{name}: {lowered.get(name, '')}" for name in VARY_HEADERS)
+        digest = hashlib.sha256(f"{method} {path}\n{vary}\n".encode("utf-8"))
+        digest.update(body or b"")
+        return digest.hexdigest()
+
+    def _fetch(self, pool, method, path, headers, body, stream: bool = False):
+        """请求上游；要求流式或响应体超过缓冲上限时返回 StreamedResponse"""
+        conn, resp = pool.open(method, path, body, headers)
+        resp_headers = [(k, v) for k, v in resp.getheaders() if k.lower() not in HOP_BY_HOP_HEADERS]
+        if stream or (resp.length is not None and resp.length > self.max_buffer_bytes):
+            return StreamedResponse(pool, conn, resp, resp_headers)
+        try:
+            if resp.length is None:
+                # 长度未知时最多读入上限加一字节，超出则带着已读部分转为流式
+                data = resp.read(self.max_buffer_bytes + 1)
+                if len(data) > self.max_buffer_bytes:
+                    return StreamedResponse(pool, conn, resp, resp_headers, prefix=data)
+                resp.read()  # 已到末尾，读取结束标记以便归还连接
+            else:
+                data = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        pool.release(conn, resp)
+        return CachedResponse(resp.status, resp_headers, data, time.time())
+
+    def _fetch_coalesced(self, key, pool, method, path, headers, body) -> CachedResponse:
+        """相同缓存键同时只有一个上游请求，其余调用等待其结果"""
+        with self.lock:
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                raise OSError("等待相同请求超时")
+            if flight.error is not None:
+                raise flight.error
+            if flight.response is None:
+                # 领头请求的响应过大、已流式转发，无法共享，单独请求
+                return self._fetch(pool, method, path, headers, body)
+            return flight.response
+
+        try:
+            response = self._fetch(pool, method, path, headers, body)
+            if isinstance(response, CachedResponse):
+                if self._is_storable(response):
+                    self.store.put(key, response)
+                flight.response = response
+            return response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            flight.done.set()
+
+    def _revalidate_async(self, key, pool, method, path, headers, body) -> None:
+        """后台刷新过期缓存，已有相同请求在途时跳过"""
+        with self.lock:
+            if key in self.inflight:
+                return
+
+        def revalidate():
+            try:
+                response = self._fetch_coalesced(key, pool, method, path, headers, body)
+                if isinstance(response, StreamedResponse):
+                    response.close()
+            except Exception as e:
+                debug(f"后台刷新失败 | 路径: {path}, 错误: {str(e)}")
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    @staticmethod
+    def _is_storable(response: CachedResponse) -> bool:
+        """只缓存成功、未声明no-store/private且不设置Cookie的响应"""
+        if response.status != 200:
+            return False
+        for name, value in response.headers:
+            name = name.lower()
+            if name == "set-cookie":
+                return False
+            if name == "cache-control" and any(
+                    directive in value.lower() for directive in ("no-store", "private")):
+                return False
+        return True
+
+    def close(self) -> None:
+        for _, pool in self.routes:
+            pool.close()
+        self.store.close()
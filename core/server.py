@@ -1,14 +1,25 @@
+import http.client
 import os
 import socket
 import select
 import threading
 import time
+from functools import partial
 from typing import Optional
+from urllib.parse import urlsplit
 from PyQt6.QtCore import QObject, pyqtSignal
 from http.server import SimpleHTTPRequestHandler
 from socketserver import ThreadingTCPServer
+from config.settings import AppConfig
+from core.proxy_cache import CachingProxy, StreamedResponse
+from core.preload import PreloadManifest
+from core.compute_service import ComputeService, COMPUTE_PATH_PREFIX
+from utils import metrics
 from utils.logger import info, error, debug
-from utils.resource_manager import ResourceManager
+
+# 服务器指标：请求数与处理耗时
+_requests = metrics.counter("server.requests")
+_request_latency = metrics.histogram("server.latency_ms")
 
 class ServerSignals(QObject):
     """服务器信号类，用于跨线程通信"""
@@ -22,12 +33,213 @@ class SilentHTTPHandler(SimpleHTTPRequestHandler):
         """重写日志方法，不输出访问日志"""
         pass
 
+class AppHTTPHandler(SilentHTTPHandler):
+    """
+    应用HTTP处理器：静态文件之外，将配置的路径前缀转发到缓存代理；
+    入口页面附带关键资源的预加载Link头，带哈希的构建产物按不可变资源长期缓存
+    """
+    
+    # 入口页面路径
+    ENTRY_PATHS = ("/", "/" + AppConfig.HTML_ENTRY)
+    # Vite输出的带内容哈希的资源目录
+    IMMUTABLE_PREFIX = "/assets/"
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    # 缓存预热页面路径
+    WARMUP_PATH = "/__preload"
+    
+    def __init__(
+        self,
+        *args,
+        proxy: Optional[CachingProxy] = None,
+        preload: Optional[PreloadManifest] = None,
+        compute: Optional[ComputeService] = None,
+        **kwargs
+    ):
+        self.proxy = proxy
+        self.preload = preload
+        self.compute = compute
+        self.response_status = 0
+        self.proxied = False
+        super().__init__(*args, **kwargs)
+    
+    def handle_one_request(self):
+        """处理单个请求并记录请求数与耗时"""
+        start = time.perf_counter()
+        super().handle_one_request()
+        if getattr(self, "command", None):
+            _requests.inc()
+            _request_latency.observe((time.perf_counter() - start) * 1000.0)
+    
+    def do_GET(self):
+        if self._try_proxy() or self._try_warmup() or self._try_compute_result():
+            return
+        super().do_GET()
+    
+    def do_HEAD(self):
+        if not self._try_proxy():
+            super().do_HEAD()
+    
+    def do_POST(self):
+        if not self._try_proxy():
+            self.send_error(405)
+    
+    do_PUT = do_DELETE = do_PATCH = do_POST
+    
+    def _try_proxy(self) -> bool:
+        """请求匹配代理前缀时转发并返回True"""
+        if self.proxy is None or self.proxy.match(self.path) is None:
+            return False
+        self.proxied = True
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        try:
+            response, cache_state = self.proxy.handle(
+                self.command, self.path, dict(self.headers.items()), body
+            )
+        except Exception as e:
+            error(f"代理请求失败 | 路径: {self.path}, 错误: {str(e)}")
+            self.send_error(502, "Bad Gateway")
+            return True
+        
+        metrics.counter(f"proxy.{cache_state.lower()}").inc()
+        if isinstance(response, StreamedResponse):
+            self._send_streamed(response, cache_state)
+            return True
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response.body)))
+        self.send_header("X-Cache", cache_state)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response.body)
+        return True
+    
+    def _send_streamed(self, response: StreamedResponse, cache_state: str) -> None:
+        """边读上游边写给客户端，上游未给出长度时以关闭连接结束响应"""
+        try:
+            self.send_response(response.status)
+            for name, value in response.headers:
+                self.send_header(name, value)
+            if response.length is not None:
+                self.send_header("Content-Length", str(response.length))
+            else:
+                self.close_connection = True
+            self.send_header("X-Cache", cache_state)
+            self.end_headers()
+            if self.command != "HEAD":
+                response.write_to(self.wfile)
+        except (OSError, http.client.HTTPException) as e:
+            debug(f"代理响应转发中断 | 路径: {self.path}, 错误: {str(e)}")
+            self.close_connection = True
+        finally:
+            response.close()
+    
+    def _request_path(self) -> str:
+        return urlsplit(self.path).path
+    
+    def _try_warmup(self) -> bool:
+        """返回预加载全部构建资源的空页面，供隐藏页面预热HTTP缓存"""
+        if self._request_path() != self.WARMUP_PATH:
+            return False
+        if self.preload is None:
+            self.send_error(404)
+            return True
+        body = self.preload.warmup_html().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+    
+    def _try_compute_result(self) -> bool:
+        """返回计算任务放在共享内存中的数组结果，结果只能取一次，发送后即释放"""
+        path = self._request_path()
+        if self.compute is None or not path.startswith(COMPUTE_PATH_PREFIX):
+            return False
+        buffer = self.compute.take_result(path[len(COMPUTE_PATH_PREFIX):])
+        if buffer is None:
+            self.send_error(404, "Compute result not found")
+            return True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(buffer.nbytes))
+            self.send_header("X-Compute-Dtype", buffer.dtype)
+            self.send_header("X-Compute-Shape", ",".join(str(n) for n in buffer.shape))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            with buffer.view() as view:
+                self.wfile.write(view)
+        finally:
+            buffer.release()
+        return True
+    
+    def send_response_only(self, code, message=None):
+        self.response_status = code
+        super().send_response_only(code, message)
+    
+    def end_headers(self):
+        """成功的静态响应附加缓存策略和预加载提示"""
+        if self.response_status in (200, 304) and not self.proxied:
+            path = self._request_path()
+            if path.startswith(self.IMMUTABLE_PREFIX):
+                self.send_header("Cache-Control", self.IMMUTABLE_CACHE_CONTROL)
+            elif path in self.ENTRY_PATHS:
+                # 入口页面每次重新验证，保证新版本的资源哈希能被及时发现
+                self.send_header("Cache-Control", "no-cache")
+                if self.preload and self.preload.critical:
+                    self.send_header("Link", ", ".join(self.preload.link_headers()))
+        super().end_headers()
+
+class BoundedThreadingTCPServer(ThreadingTCPServer):
+    """限制并发处理线程数的多线程服务器"""
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, server_address, handler_class, max_workers: int, request_queue: int):
+        self.request_queue_size = request_queue
+        self.worker_slots = threading.BoundedSemaphore(max_workers)
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        """获取空闲工作槽后再派发请求，满载时阻塞接收以形成背压"""
+        self.worker_slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.worker_slots.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.worker_slots.release()
+
 class HTTPServerManager:
     """HTTP服务器管理器，负责启动、管理和停止HTTP服务器"""
     
-    def __init__(self, port: int, directory: str):
+    def __init__(
+        self,
+        port: int,
+        directory: str,
+        max_workers: int = 8,
+        request_queue: int = 32,
+        proxy: Optional[CachingProxy] = None,
+        preload_hints: bool = True,
+        compute: Optional[ComputeService] = None
+    ):
         self.port = port
         self.directory = directory
+        self.proxy = proxy
+        self.preload_hints = preload_hints
+        self.compute = compute
+        self.preload: Optional[PreloadManifest] = None
+        self.max_workers = max_workers
+        self.request_queue = request_queue
         self.server: Optional[ThreadingTCPServer] = None
         self.thread: Optional[threading.Thread] = None
         self.running = False
@@ -51,17 +263,27 @@ class HTTPServerManager:
             if not os.path.exists(self.directory):
                 raise FileNotFoundError(f"服务目录不存在: {self.directory}")
             
-            os.chdir(self.directory)
-            # 创建服务器
-            self.server = ThreadingTCPServer(
-                ("", self.port), 
-                SilentHTTPHandler
+            # 启动时解析一次构建清单，入口页面的预加载提示直接复用
+            if self.preload_hints:
+                self.preload = PreloadManifest.load(self.directory)
+            
+            # 创建服务器（处理器直接指定服务目录，不修改进程工作目录）
+            handler = partial(
+                AppHTTPHandler,
+                directory=self.directory,
+                proxy=self.proxy,
+                preload=self.preload,
+                compute=self.compute
+            )
+            self.server = BoundedThreadingTCPServer(
+                (AppConfig.SERVER_HOST, self.port),
+                handler,
+                self.max_workers,
+                self.request_queue
             )
-            # 设置地址复用
-            self.server.allow_reuse_address = True
             self.server.timeout = 0.1  # 缩短超时时间，加快响应停止信号
             self.signals.started.emit(self.port)
-            info(f"HTTP服务器启动 | 端口: {self.port}, 目录: {self.directory}")
+            info(f"HTTP服务器启动 | 端口: {self.port}, 目录: {self.directory}, 工作线程: {self.max_workers}")
             
             # 循环处理请求，直到收到停止信号
             while self.running:
@@ -114,6 +336,14 @@ class HTTPServerManager:
             except Exception as e:
                 error(f"服务器清理失败: {str(e)}")
             self.server = None
+        
+        # 关闭代理连接池和缓存存储
+        if self.proxy:
+            try:
+                self.proxy.close()
+            except Exception as e:
+                error(f"代理清理失败: {str(e)}")
+            self.proxy = None
     
     def stop(self) -> None:
         """停止服务器"""
@@ -1,21 +1,37 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QLocale, QTranslator, QTimer
-from ui.splash_screen import SplashScreen
-from ui.main_window import WebBrowserWindow
+import multiprocessing
 from config.settings import AppConfig
-from utils.resource_manager import ResourceManager
+from config.profile import PerformanceProfile, ProfileError, strip_profile_args
 from utils.logger import info, error, Logger
 
 def main():
     """应用程序主入口"""
+    # 计算工作进程以spawn方式启动时会重新导入本模块，Qt界面相关模块只在主进程导入
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QLocale, QTranslator, QTimer
+    from ui.splash_screen import SplashScreen
+    from ui.window_manager import WindowManager
+    from utils.resource_manager import ResourceManager
+    
     # 初始化日志
     Logger()
     info("=" * 50)
     info(f"应用程序启动 | {AppConfig.APP_NAME} v{AppConfig.APP_VERSION}")
     
+    # 加载性能配置，Chromium参数必须在创建QApplication之前写入环境变量
+    try:
+        profile = PerformanceProfile.load(sys.argv[1:])
+    except ProfileError as e:
+        error(f"性能配置无效: {str(e)}")
+        sys.exit(2)
+    Logger.set_level(profile.get("log_level"))
+    chromium_flags = profile.apply_chromium_flags()
+    for line in profile.describe():
+        info(line)
+    info(f"Chromium参数: {chromium_flags or '(无)'}")
+    
     # 创建应用实例
-    app = QApplication(sys.argv)
+    app = QApplication(strip_profile_args(sys.argv))
     app.setApplicationName(AppConfig.APP_NAME)
     app.setOrganizationName(AppConfig.ORGANIZATION_NAME)
     app.setOrganizationDomain(AppConfig.ORGANIZATION_DOMAIN)
@@ -35,8 +51,10 @@ def main():
     splash = SplashScreen(app)
     app.processEvents()  # 确保启动画面立即显示
     
-    # 创建主窗口（但不显示）
-    main_window = WebBrowserWindow(splash=splash)
+    # 创建窗口管理器和窗口（但不显示），所有窗口共享服务器、WebEngine配置和桥接中心
+    manager = WindowManager(splash=splash)
+    windows = [manager.create_window() for _ in range(max(1, profile.get("window_count")))]
+    main_window = windows[0]
     
     # 连接初始化完成信号
     def on_initialization_complete():
@@ -46,9 +64,10 @@ def main():
         # 启动启动画面淡出动画
         splash.start_fade_out()
         
-        # 在启动画面淡出动画完成后显示主窗口
+        # 在启动画面淡出动画完成后显示所有窗口
         def show_main_window():
-            main_window.show_with_animation()
+            for window in windows:
+                window.show_with_animation()
         
         # 使用定时器确保在启动画面完全关闭后再显示主窗口
         QTimer.singleShot(600, show_main_window)
@@ -65,4 +84,6 @@ def main():
     sys.exit(ret)
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，计算工作进程由同一可执行文件启动
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from core.dataset import ColumnarTable, DatasetError
+
+
+class ColumnarTableIndexTest(unittest.TestCase):
+    """追加数据后增量维护的排序索引和等值索引与整列重新计算的结果一致"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.table = ColumnarTable("t", {"id": "i8", "cat": "i8", "score": "f8"})
+        self.data = {"id": np.empty(0, np.int64), "cat": np.empty(0, np.int64), "score": np.empty(0)}
+
+    def append(self, count, categories=5):
+        chunk = {
+            "id": self.rng.integers(0, 1_000_000, count),
+            "cat": self.rng.integers(0, categories, count),
+            "score": self.rng.random(count),
+        }
+        self.table.append(chunk)
+        for col, values in chunk.items():
+            self.data[col] = np.concatenate([self.data[col], values])
+
+    def rows(self, **kwargs):
+        result = self.table.query(length=self.table.size, **kwargs)
+        return [row[0] for row in result["rows"]], result["total"]
+
+    def test_sort_index_merged_on_append(self):
+        self.append(500)
+        self.rows(sort_by="score")  # 构建排序索引
+        self.append(300)
+        self.append(1)
+        ids, total = self.rows(sort_by="score", columns=["id"])
+        expected = self.data["id"][np.argsort(self.data["score"], kind="stable")]
+        self.assertEqual(total, 801)
+        self.assertEqual(ids, expected.tolist())
+
+        ids, total = self.rows(filters=[{"column": "score", "op": "between", "value": [0.25, 0.5]}],
+                               columns=["id"])
+        mask = (self.data["score"] >= 0.25) & (self.data["score"] <= 0.5)
+        self.assertEqual(ids, self.data["id"][mask].tolist())
+
+    def test_value_index_extended_on_append(self):
+        self.append(2000)
+        self.rows(filters=[{"column": "cat", "op": "eq", "value": 3}])
+        self.assertIn("cat", self.table.value_indexes)
+        self.append(700)
+        ids, total = self.rows(filters=[{"column": "cat", "op": "in", "value": [1, 3]}], columns=["id"])
+        mask = np.isin(self.data["cat"], [1, 3])
+        self.assertEqual(total, int(mask.sum()))
+        self.assertEqual(ids, self.data["id"][mask].tolist())
+
+    def test_value_index_dropped_when_cardinality_grows(self):
+        self.append(2000)
+        self.rows(filters=[{"column": "cat", "op": "eq", "value": 3}])
+        self.append(500, categories=10_000)
+        self.assertNotIn("cat", self.table.value_indexes)
+        self.assertIn("cat", self.table.high_cardinality)
+        value = int(self.data["cat"][-1])
+        ids, _ = self.rows(filters=[{"column": "cat", "op": "eq", "value": value}], columns=["id"])
+        self.assertEqual(ids, self.data["id"][self.data["cat"] == value].tolist())
+
+    def test_high_cardinality_equality_uses_sort_index(self):
+        self.append(3000)
+        targets = [int(v) for v in self.data["id"][[5, 17, 900]]]
+        ids, _ = self.rows(filters=[{"column": "id", "op": "in", "value": targets + ["x", None]}],
+                           columns=["id"])
+        self.assertNotIn("id", self.table.value_indexes)
+        self.assertEqual(ids, self.data["id"][np.isin(self.data["id"], targets)].tolist())
+        self.append(200)
+        target = int(self.data["id"][-1])
+        ids, _ = self.rows(filters=[{"column": "id", "op": "eq", "value": target}], columns=["id"])
+        self.assertEqual(ids, self.data["id"][self.data["id"] == target].tolist())
+
+    def test_invalid_filter_rejected(self):
+        self.append(10)
+        with self.assertRaises(DatasetError):
+            self.table.query(filters=[{"column": "id", "op": "in", "value": 3}])
+
+
+if __name__ == "__main__":
+    unittest.main()
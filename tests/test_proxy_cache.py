@@ -0,0 +1,147 @@
+import io
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.proxy_cache import CachingProxy, ResponseStore, StreamedResponse
+
+
+class StubUpstream(BaseHTTPRequestHandler):
+    """本地上游桩：响应体为递增计数，可按路径延迟响应、附加响应头或返回大响应体"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with server.lock:
+            server.hits.append((self.command, self.path))
+            body = str(len(server.hits)).encode("ascii")
+        if "/slow" in self.path:
+            time.sleep(0.3)
+        if "/big" in self.path:
+            body = b"x" * (256 * 1024)
+        self.send_response(503 if server.failing else 200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        if "/private" in self.path:
+            self.send_header("Cache-Control", "private, max-age=60")
+        if "/session" in self.path:
+            self.send_header("Set-Cookie", "sid=abc")
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+
+class CachingProxyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.upstream = ThreadingHTTPServer(("127.0.0.1", 0), StubUpstream)
+        self.upstream.lock = threading.Lock()
+        self.upstream.hits = []
+        self.upstream.failing = False
+        threading.Thread(target=self.upstream.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.upstream.server_address[1]}"
+        self.proxy = CachingProxy(
+            {"/api": base}, ResponseStore(":memory:", 1024 * 1024),
+            ttl=0.2, stale_while_revalidate=60, timeout=5,
+            cacheable_posts=["/api/query"], max_buffer_bytes=64 * 1024
+        )
+
+    def tearDown(self):
+        self.proxy.close()
+        self.upstream.shutdown()
+        self.upstream.server_close()
+
+    def get(self, path, headers=None):
+        response, state = self.proxy.handle("GET", path, headers or {}, None)
+        return self.read(response).decode("ascii"), state
+
+    @staticmethod
+    def read(response):
+        if isinstance(response, StreamedResponse):
+            out = io.BytesIO()
+            response.write_to(out)
+            return out.getvalue()
+        return response.body
+
+    def wait_for_hits(self, count):
+        deadline = time.time() + 5
+        while len(self.upstream.hits) < count and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.get("/api/items"), ("1", "MISS"))
+        self.assertEqual(self.get("/api/items"), ("1", "HIT"))
+        self.assertEqual(len(self.upstream.hits), 1)
+
+    def test_stale_served_while_revalidating(self):
+        self.get("/api/items")
+        time.sleep(0.25)
+        self.assertEqual(self.get("/api/items"), ("1", "STALE"))
+        self.wait_for_hits(2)
+        time.sleep(0.05)
+        self.assertEqual(self.get("/api/items"), ("2", "HIT"))
+
+    def test_concurrent_misses_are_coalesced(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.get("/api/slow")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.upstream.hits), 1)
+        self.assertEqual({body for body, _ in results}, {"1"})
+
+    def test_bypass(self):
+        # 未声明为只读的POST、带凭据或会话Cookie的GET都直接转发
+        for _ in range(2):
+            response, state = self.proxy.handle("POST", "/api/orders", {}, b"{}")
+            self.read(response)
+            self.assertEqual(state, "BYPASS")
+            self.assertEqual(self.get("/api/items", {"Authorization": "Bearer t"})[1], "BYPASS")
+            self.assertEqual(self.get("/api/items", {"Cookie": "sid=1"})[1], "BYPASS")
+        self.assertEqual(len(self.upstream.hits), 6)
+
+    def test_private_and_set_cookie_responses_not_stored(self):
+        for path in ("/api/private", "/api/session"):
+            self.assertEqual(self.get(path)[1], "MISS")
+            self.assertEqual(self.get(path)[1], "MISS")
+        self.assertEqual(len(self.upstream.hits), 4)
+
+    def test_server_error_falls_back_to_stale(self):
+        self.get("/api/items")
+        time.sleep(0.25)
+        self.upstream.failing = True
+        self.proxy.stale_while_revalidate = 0  # 过期后同步请求上游
+        self.assertEqual(self.get("/api/items"), ("1", "STALE"))
+        self.assertEqual(len(self.upstream.hits), 2)
+
+    def test_large_response_streamed_and_not_cached(self):
+        response, state = self.proxy.handle("GET", "/api/big", {}, None)
+        self.assertIsInstance(response, StreamedResponse)
+        self.assertEqual(state, "MISS")
+        self.assertEqual(len(self.read(response)), 256 * 1024)
+        self.assertEqual(self.proxy.handle("GET", "/api/big", {}, None)[1], "MISS")
+        # 读完的连接归还连接池后可复用
+        self.assertEqual(self.get("/api/items"), ("3", "MISS"))
+
+    def test_read_only_post_cached_by_body(self):
+        self.assertEqual(self.proxy.handle("POST", "/api/query", {}, b"a")[1], "MISS")
+        self.assertEqual(self.proxy.handle("POST", "/api/query", {}, b"a")[1], "HIT")
+        self.assertEqual(self.proxy.handle("POST", "/api/query", {}, b"b")[1], "MISS")
+
+    def test_accept_header_is_part_of_key(self):
+        self.get("/api/items", {"Accept": "application/json"})
+        self.assertEqual(self.get("/api/items", {"Accept": "text/csv"})[1], "MISS")
+
+
+if __name__ == "__main__":
+    unittest.main()
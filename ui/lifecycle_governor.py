@@ -0,0 +1,177 @@
+import time
+from PyQt6.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from config.profile import PerformanceProfile
+from utils.memory import get_process_rss, format_bytes
+from utils.logger import info, debug
+
+LifecycleState = QWebEnginePage.LifecycleState
+
+# 视为用户操作的输入事件（不含鼠标移动，避免悬停时频繁进入Python）
+_INPUT_EVENTS = {
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.KeyPress,
+    QEvent.Type.Wheel,
+    QEvent.Type.TouchBegin,
+}
+
+class LifecycleGovernor(QObject):
+    """
+    页面生命周期调控器：窗口隐藏/最小化且用户在该窗口页面上无操作达到阈值后，
+    将页面依次冻结、丢弃，返回时恢复
+    """
+
+    # 信号定义 - (窗口ID, 状态名)
+    state_changed = pyqtSignal(str, str)
+    # 窗口可见性变化 - (窗口ID, 是否可见)，与冻结/丢弃是否启用无关
+    visibility_changed = pyqtSignal(str, bool)
+
+    def __init__(self, window, hub, parent: QObject = None):
+        super().__init__(parent or window)
+        self.window = window
+        self.hub = hub
+        profile = PerformanceProfile.active()
+        self.freeze_after = profile.get("lifecycle_freeze_after_s")
+        self.discard_after = profile.get("lifecycle_discard_after_s")
+        self.discard_rss = profile.get("lifecycle_discard_rss_mb") * 1024 * 1024
+        # 冻结与丢弃可单独启用
+        self.enabled = self.freeze_after > 0 or self.discard_after > 0
+
+        self.hidden_since = None  # 窗口开始隐藏的时间
+        self.visible = window.isVisible()  # 窗口可见且未最小化
+        self.last_input = time.monotonic()  # 最近一次在页面上的鼠标/键盘/触摸输入
+        self.input_target = None  # 接收页面输入的部件（WebView的焦点代理）
+
+        # 只在窗口隐藏期间运行的检查定时器
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(profile.get("lifecycle_check_interval_s") * 1000))
+        self.timer.timeout.connect(self.evaluate)
+
+        # 只过滤本窗口及其页面的事件，不安装应用级过滤器，避免每个Qt事件都进入Python
+        window.installEventFilter(self)
+        # 焦点代理在页面渲染后创建，渲染进程重建后会替换，每次加载完成后重新接入
+        if window.web_view:
+            window.web_view.page().loadFinished.connect(self._track_input)
+
+    @property
+    def page(self) -> QWebEnginePage:
+        return self.window.web_view.page() if self.window.web_view else None
+
+    def _track_input(self, *_args) -> None:
+        """在WebView的焦点代理上监听用户输入，代理替换后移到新部件"""
+        proxy = self.window.web_view.focusProxy() if self.window.web_view else None
+        if proxy is None or proxy is self.input_target:
+            return
+        self._untrack_input()
+        proxy.installEventFilter(self)
+        self.input_target = proxy
+
+    def _untrack_input(self) -> None:
+        if self.input_target is not None:
+            try:
+                self.input_target.removeEventFilter(self)
+            except RuntimeError:  # 部件已随渲染进程重建销毁
+                pass
+            self.input_target = None
+
+    def eventFilter(self, obj, event) -> bool:
+        """监听页面输入以及窗口可见性变化"""
+        event_type = event.type()
+        if obj is self.input_target:
+            if event_type in _INPUT_EVENTS:
+                self.last_input = time.monotonic()
+            return False
+        if obj is not self.window:
+            return False
+        if event_type == QEvent.Type.Hide or (
+                event_type == QEvent.Type.WindowStateChange and self.window.isMinimized()):
+            self._set_visible(False)
+            self.on_hidden()
+        elif event_type == QEvent.Type.Show or (
+                event_type == QEvent.Type.WindowStateChange and not self.window.isMinimized()
+                and self.window.isVisible()):
+            self._track_input()
+            self._set_visible(True)
+            self.on_visible()
+        return False
+
+    def _set_visible(self, visible: bool) -> None:
+        if visible != self.visible:
+            self.visible = visible
+            self.visibility_changed.emit(self.window.window_id, visible)
+
+    def on_hidden(self) -> None:
+        """窗口隐藏或最小化"""
+        if not self.enabled or self.hidden_since is not None or self.page is None:
+            return
+        self.hidden_since = time.monotonic()
+        # 最小化时视图仍处于可见状态，需显式标记页面不可见才能冻结
+        self.page.setVisible(False)
+        self.timer.start()
+        debug(f"窗口已隐藏 | 窗口: {self.window.window_id}")
+
+    def on_visible(self) -> None:
+        """窗口重新可见，恢复页面和桥接消息"""
+        if self.hidden_since is None:
+            return
+        self.hidden_since = None
+        self.timer.stop()
+        page = self.page
+        if page is None:
+            return
+
+        previous = page.lifecycleState()
+        page.setVisible(True)
+        page.setLifecycleState(LifecycleState.Active)
+        if previous == LifecycleState.Discarded:
+            # 丢弃的页面会重新加载，加载完成后再补发消息，避免消息丢失
+            page.loadFinished.connect(self.on_restored_load_finished)
+        else:
+            self.hub.resume_window(self.window.window_id)
+        if previous != LifecycleState.Active:
+            self._log_state(LifecycleState.Active)
+
+    def on_restored_load_finished(self, _success: bool) -> None:
+        """丢弃后重新加载完成"""
+        self.page.loadFinished.disconnect(self.on_restored_load_finished)
+        self.hub.resume_window(self.window.window_id)
+
+    def evaluate(self) -> None:
+        """窗口隐藏期间，根据页面无输入的时长和渲染进程内存决定目标状态"""
+        page = self.page
+        if page is None or self.hidden_since is None:
+            return
+        # 空闲时长从最后一次输入算起（包括窗口可见期间），刚操作过就隐藏的窗口要等满阈值才冻结
+        idle = time.monotonic() - self.last_input
+        state = page.lifecycleState()
+
+        target = state
+        if state == LifecycleState.Active and 0 < self.freeze_after <= idle:
+            target = LifecycleState.Frozen
+        if state != LifecycleState.Discarded:
+            if self.discard_after > 0 and idle >= self.discard_after:
+                target = LifecycleState.Discarded
+            elif self.discard_rss > 0 and state == LifecycleState.Frozen:
+                rss = get_process_rss(page.renderProcessPid())
+                if rss >= self.discard_rss:
+                    info(f"渲染进程内存超限 | 窗口: {self.window.window_id}, 内存: {format_bytes(rss)}")
+                    target = LifecycleState.Discarded
+
+        if target != state:
+            self.hub.pause_window(self.window.window_id)
+            page.setLifecycleState(target)
+            self._log_state(target)
+        if target == LifecycleState.Discarded:
+            # 已是最终状态，停止检查直到窗口再次可见
+            self.timer.stop()
+
+    def _log_state(self, state) -> None:
+        """记录并通知状态变化"""
+        info(f"页面生命周期变更 | 窗口: {self.window.window_id}, 状态: {state.name}")
+        self.state_changed.emit(self.window.window_id, state.name)
+
+    def detach(self) -> None:
+        """停止调控并移除事件过滤器"""
+        self.timer.stop()
+        self._untrack_input()
+        self.window.removeEventFilter(self)
@@ -1,14 +1,16 @@
-import os
 import time
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QWidget, QMessageBox, QPushButton, QApplication)
 from PyQt6.QtCore import (QUrl, Qt, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve, QThread)
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineSettings
+from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEnginePage
 from config.settings import AppConfig
-from core.bridge import Bridge
-from core.server import HTTPServerManager
+from core.bridge import BridgeHub
+from core.js_evaluator import JsEvaluator
+from core.page_scripts import install_bridge_scripts
+from ui.lifecycle_governor import LifecycleGovernor
+from ui.perf_hud import PerfHud
 from utils.resource_manager import ResourceManager
-from utils.port_manager import PortManager
 from utils.logger import info, error, debug
 
 class WebBrowserWindow(QMainWindow):
@@ -17,15 +19,16 @@ class WebBrowserWindow(QMainWindow):
     # 信号定义
     initialization_complete = pyqtSignal()
     
-    def __init__(self, splash=None):
+    def __init__(self, manager, window_id: str = "main", splash=None):
         super().__init__()
-        self.original_port = AppConfig.DEFAULT_PORT
-        self.html_path = os.path.join(AppConfig.VUE_DIST_PATH, AppConfig.HTML_ENTRY)
-        self.server_manager: HTTPServerManager = None
+        self.manager = manager  # 窗口管理器，提供共享的服务器、WebEngine配置和桥接中心
+        self.window_id = window_id
         self.web_view: QWebEngineView = None
-        self.bridge: Bridge = None
-        self.final_port: int = None
+        self.bridge: BridgeHub = None
+        self.calculator_button: QPushButton = None
+        self.js: JsEvaluator = None  # 页面JavaScript执行器
         self.is_closing = False  # 标记是否正在关闭
+        self.initialized = False  # 首次加载完成后置位，丢弃恢复等重新加载不再通知
         self.splash = splash  # 启动画面引用
         
         # 设置窗口初始透明度（用于淡入效果）
@@ -37,13 +40,18 @@ class WebBrowserWindow(QMainWindow):
         
         self.init_ui()
         self.load_qss()
-        self.setup_server()
         
-        info("主窗口初始化完成")
+        # 窗口隐藏时冻结/丢弃页面，降低后台CPU和内存占用
+        self.lifecycle_governor = LifecycleGovernor(self, self.manager.hub)
+        
+        info(f"主窗口初始化完成 | 窗口: {self.window_id}")
     
     def init_ui(self) -> None:
         """初始化用户界面"""
-        self.setWindowTitle(f"{AppConfig.APP_NAME} v{AppConfig.APP_VERSION}")
+        title = f"{AppConfig.APP_NAME} v{AppConfig.APP_VERSION}"
+        if self.window_id != "main":
+            title = f"{title} - {self.window_id}"
+        self.setWindowTitle(title)
         self.setGeometry(
             100, 100, 
             AppConfig.WINDOW_WIDTH, 
@@ -56,9 +64,12 @@ class WebBrowserWindow(QMainWindow):
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.setCentralWidget(central_widget)
         
-        # 初始化WebView
+        # 初始化WebView，页面使用共享的WebEngine配置
         self.web_view = QWebEngineView()
+        self.web_view.setPage(QWebEnginePage(self.manager.web_profile, self.web_view))
         self.main_layout.addWidget(self.web_view)
+        self.js = JsEvaluator(self.web_view.page(), self.manager.hub, self)
+        self.init_web_channel()
         
         # 配置Web设置
         settings = self.web_view.settings()
@@ -68,6 +79,18 @@ class WebBrowserWindow(QMainWindow):
         # 设置窗口图标
         if ResourceManager.exists(AppConfig.ICON_PATH):
             self.setWindowIcon(ResourceManager.load_icon(AppConfig.ICON_PATH))
+        
+        # 快捷键：切换卡顿检测
+        self.stall_shortcut = QShortcut(QKeySequence(AppConfig.STALL_DETECTOR_SHORTCUT), self)
+        self.stall_shortcut.activated.connect(self.toggle_stall_detector)
+        
+        # 性能浮层：快捷键切换显示，另一快捷键导出指标快照
+        self.perf_hud = PerfHud(self)
+        self.web_view.page().loadFinished.connect(self.perf_hud.on_page_loaded)
+        self.hud_shortcut = QShortcut(QKeySequence(AppConfig.PERF_HUD_SHORTCUT), self)
+        self.hud_shortcut.activated.connect(self.perf_hud.toggle)
+        self.export_shortcut = QShortcut(QKeySequence(AppConfig.METRICS_EXPORT_SHORTCUT), self)
+        self.export_shortcut.activated.connect(self.perf_hud.export_snapshot)
     
     def load_qss(self) -> None:
         """加载QSS样式表"""
@@ -79,78 +102,30 @@ class WebBrowserWindow(QMainWindow):
             except Exception as e:
                 error(f"QSS加载失败: {str(e)}")
     
-    def setup_server(self) -> None:
-        """设置并启动HTTP服务器"""
-        # 更新启动画面状态
-        if self.splash:
-            self.splash.set_status("正在启动服务器...")
-        
-        vue_dir = ResourceManager.get_path(AppConfig.VUE_DIST_PATH)
-        if not os.path.exists(vue_dir):
-            QMessageBox.critical(
-                self, "启动错误", 
-                f"无法找到Vue项目目录:\n{vue_dir}"
-            )
-            self.close()
-            return
-        
-        self.final_port = PortManager.find_available_port(self.original_port)
-        if not self.final_port:
-            QMessageBox.critical(self, "启动错误", "无法找到可用端口")
-            self.close()
-            return
-        
-        # 初始化服务器管理器
-        self.server_manager = HTTPServerManager(self.final_port, vue_dir)
-        self.server_manager.signals.started.connect(self.on_server_started)
-        self.server_manager.signals.failed.connect(self.on_server_failed)
-        self.server_manager.start()
-    
-    def on_server_started(self, port: int) -> None:
-        """服务器启动成功后加载HTML"""
-        info(f"服务器启动完成 | 端口: {port}")
-        
-        # 更新启动画面状态
-        if self.splash:
-            self.splash.set_status("正在加载Web页面...")
-        
-        self.load_html()
-    
-    def on_server_failed(self, error_msg: str, details: dict) -> None:
-        """服务器启动失败处理"""
-        error(f"服务器启动失败详情: {details}")
-        QMessageBox.critical(
-            self, "服务器启动失败", 
-            f"启动HTTP服务器时发生错误:\n{error_msg}"
-        )
-        self.close()
-    
     def load_html(self) -> None:
         """加载目标HTML页面"""
-        html_file = os.path.basename(self.html_path)
-        url = QUrl(f"http://localhost:{self.final_port}/{html_file}#/")
-        info(f"加载页面 | URL: {url.toString()}")
+        url = self.manager.page_url(self.window_id)
+        info(f"加载页面 | 窗口: {self.window_id}, URL: {url.toString()}")
         self.web_view.load(url)
         self.web_view.page().loadFinished.connect(self.on_page_load_finished)
     
     def on_page_load_finished(self, success: bool) -> None:
         """页面加载完成回调"""
+        self.manager.on_window_loaded(self.window_id)
         if success:
-            info("Web页面加载完成，初始化通信通道")
-            
-            # 更新启动画面状态
-            if self.splash:
-                self.splash.set_status("正在初始化通信通道...")
+            info("Web页面加载完成")
             
-            self.init_web_channel()
+            # 发送初始化消息（通信通道在加载前已建立）
+            if self.bridge:
+                self.bridge.send_to(self.window_id, "Qt应用已启动，通信通道已建立")
             self.add_calculator_button()
             
-            # 更新启动画面状态
-            if self.splash:
-                self.splash.set_status("正在准备主窗口...")
-            
-            # 标记初始化完成
-            self.initialization_complete.emit()
+            # 首次加载时更新启动画面并标记初始化完成（只通知一次，丢弃恢复等重新加载不会再次显示窗口）
+            if not self.initialized:
+                self.initialized = True
+                if self.splash:
+                    self.splash.set_status("正在准备主窗口...")
+                self.initialization_complete.emit()
         else:
             error("Web页面加载失败")
             QMessageBox.warning(
@@ -159,52 +134,57 @@ class WebBrowserWindow(QMainWindow):
             )
     
     def init_web_channel(self) -> None:
-        """初始化WebChannel通信"""
+        """
+        初始化WebChannel通信：必须在页面加载前完成，
+        文档创建时 qt.webChannelTransport 即可用，注入的引导脚本立即建立连接
+        """
         try:
-            self.bridge = Bridge()
-            self.bridge.setup_channel(self.web_view.page())
-            
-            # 连接信号示例
-            self.bridge.messageFromQt.connect(self.on_bridge_message)
+            self.bridge = self.manager.hub
+            page = self.web_view.page()
+            install_bridge_scripts(page)
+            self.bridge.attach(self.window_id, page)
             
-            # 发送初始化消息
-            self.bridge.send_message_to_web("Qt应用已启动，通信通道已建立")
+            # 只处理发往本窗口的消息
+            self.bridge.windowMessageReceived.connect(self.on_window_message)
             info("WebChannel初始化成功")
         except Exception as e:
             error(f"WebChannel初始化失败: {str(e)}")
-            QMessageBox.error(
+            QMessageBox.critical(
                 self, "通信初始化失败", 
                 f"Qt与Web页面通信失败:\n{str(e)}"
             )
     
     def add_calculator_button(self) -> None:
-        """添加计算按钮"""
-        calculator_button = QPushButton("执行计算 (55 + 3)")
-        calculator_button.clicked.connect(self.execute_calculation)
-        self.main_layout.addWidget(calculator_button)
+        """添加计算按钮（页面重新加载时不重复添加）"""
+        if self.calculator_button:
+            return
+        self.calculator_button = QPushButton("执行计算 (55 + 3)")
+        self.calculator_button.clicked.connect(self.execute_calculation)
+        self.main_layout.addWidget(self.calculator_button)
     
     def execute_calculation(self) -> None:
         """执行JavaScript计算"""
-        if not self.web_view:
+        if not self.js:
             return
-            
-        self.web_view.page().runJavaScript("""
-            if (window.webCalculator && typeof window.webCalculator.performCalculation === 'function') {
-                webCalculator.performCalculation(55, 3)
-                    .then(result => {
-                        if (window.bridge && typeof window.bridge.receiveCalculationResult === 'function') {
-                            window.bridge.receiveCalculationResult(result);
-                        }
-                    })
-                    .catch(error => console.error('计算失败:', error));
-            } else {
-                console.error('webCalculator未定义或performCalculation方法不存在');
-            }
-        """)
+        
+        future = self.js.call("webCalculator.performCalculation", 55, 3)
+        future.add_done_callback(self.on_calculation_done)
     
-    def on_bridge_message(self, message: str) -> None:
-        """处理桥接器发来的消息"""
-        debug(f"桥接器消息: {message}")
+    def on_calculation_done(self, future) -> None:
+        """页面计算完成回调"""
+        try:
+            info(f"收到Web计算结果: {future.result()}")
+        except Exception as e:
+            error(f"计算失败: {str(e)}")
+    
+    def on_window_message(self, window_id: str, message: str) -> None:
+        """处理本窗口页面经桥接中心发来的消息"""
+        if window_id == self.window_id:
+            debug(f"桥接器消息 | 窗口: {window_id}, 内容: {message}")
+    
+    def toggle_stall_detector(self) -> None:
+        """运行时启用/停用共享的卡顿检测器"""
+        self.manager.stall_detector.toggle()
     
     def show_with_animation(self) -> None:
         """带动画显示主窗口"""
@@ -230,13 +210,14 @@ class WebBrowserWindow(QMainWindow):
         start_time = time.time()
         
         try:
-            # 1. 优先停止服务器
-            if self.server_manager:
-                debug("停止HTTP服务器")
-                self.server_manager.stop()
-                self.server_manager = None
+            # 0. 停止生命周期调控和性能浮层
+            self.lifecycle_governor.detach()
+            if self.perf_hud.isVisible():
+                self.perf_hud.set_visible(False)
             
-            # 2. 停止页面加载和JavaScript活动
+            # 1. 停止页面加载和JavaScript活动
+            if self.js:
+                self.js.cancel_all()
             if self.web_view:
                 debug("停止Web页面活动")
                 self.web_view.stop()  # 停止加载
@@ -244,27 +225,26 @@ class WebBrowserWindow(QMainWindow):
                 self.web_view.page().loadFinished.disconnect()
                 QApplication.processEvents()  # 处理事件循环
             
-            # 3. 清理WebEngine资源
+            # 2. 断开共享桥接中心
+            if self.bridge:
+                self.bridge.windowMessageReceived.disconnect(self.on_window_message)
+                self.bridge = None
+            
+            # 3. 释放页面（共享的WebEngine配置由窗口管理器持有）
             if self.web_view:
                 debug("清理WebEngine资源")
-                # 清除缓存和访问记录
-                profile = self.web_view.page().profile()
-                profile.clearHttpCache()
-                profile.clearAllVisitedLinks()
-                
-                # 安全删除WebView
+                page = self.web_view.page()
                 self.web_view.setPage(None)
+                page.deleteLater()
                 self.web_view.deleteLater()
                 self.web_view = None
             
-            # 4. 清理通信桥接
-            if self.bridge:
-                self.bridge.deleteLater()
-                self.bridge = None
-            QApplication.instance().quit()
+            # 4. 通知窗口管理器，最后一个窗口关闭时停止服务器并退出
+            self.manager.release_window(self.window_id)
             info(f"资源释放完成 | 总耗时: {time.time() - start_time:.3f}s")
             event.accept()
             
         except Exception as e:
             error(f"关闭过程中发生错误: {str(e)}", exc_info=True)
+            self.manager.release_window(self.window_id)
             event.accept()
@@ -0,0 +1,127 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from PyQt6.QtWidgets import QLabel, QMainWindow
+from PyQt6.QtCore import Qt, QTimer, QEvent, QObject
+from PyQt6.QtGui import QFont
+from config.profile import PerformanceProfile
+from utils import metrics
+from utils.logger import Logger, info
+
+# 指标快照导出目录（位于日志目录下）
+METRICS_DIR_NAME = "metrics"
+
+_HUD_STYLE = (
+    "QLabel#perfHud { background-color: rgba(0, 0, 0, 180); color: #7CFC00;"
+    " border-radius: 4px; padding: 6px; }"
+)
+
+
+def _fmt(value: Optional[float], unit: str = "", digits: int = 1) -> str:
+    return "—" if value is None else f"{value:.{digits}f}{unit}"
+
+
+class PerfHud(QLabel):
+    """性能浮层：每秒从指标注册表读取快照，显示桥接、服务器、事件循环与页面指标"""
+
+    REFRESH_MS = 1000
+    MARGIN = 10
+
+    def __init__(self, window: QMainWindow):
+        super().__init__(window)
+        self.host = window
+        self.setObjectName("perfHud")
+        self.setStyleSheet(_HUD_STYLE)
+        self.setFont(QFont("monospace", 9))
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.hide()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        window.installEventFilter(self)
+
+    def toggle(self) -> None:
+        self.set_visible(not self.isVisible())
+
+    def set_visible(self, visible: bool) -> None:
+        """显示时开始刷新并请求页面上报，隐藏时全部停止"""
+        hub = self.host.manager.hub
+        if visible:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.hide()
+            self.timer.stop()
+        hub.request_page_metrics(self.host.window_id, visible)
+
+    def on_page_loaded(self, ok: bool) -> None:
+        """页面重新加载后上报状态丢失，重新请求"""
+        if ok and self.isVisible():
+            self.host.manager.hub.request_page_metrics(self.host.window_id, True)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self.host and event.type() == QEvent.Type.Resize and self.isVisible():
+            self._reposition()
+        return False
+
+    def refresh(self) -> None:
+        self.setText(self.format_snapshot(metrics.registry.snapshot(), self.host.window_id))
+        self.adjustSize()
+        self._reposition()
+
+    def _reposition(self) -> None:
+        """固定在窗口右上角"""
+        self.move(self.host.width() - self.width() - self.MARGIN, self.MARGIN)
+
+    @staticmethod
+    def format_snapshot(snapshot: Dict[str, Any], window_id: str) -> str:
+        """将指标快照格式化为浮层文本"""
+        counters = snapshot["counters"]
+        gauges = snapshot["gauges"]
+        histograms = snapshot["histograms"]
+
+        def rate(name):
+            return counters.get(name, {}).get("rate")
+
+        def pct(name, q):
+            return histograms.get(name, {}).get(q)
+
+        proxy = {state: counters.get(f"proxy.{state}", {}).get("total", 0)
+                 for state in ("hit", "stale", "miss")}
+        proxy_total = sum(proxy.values())
+        hit_rate = (proxy["hit"] + proxy["stale"]) * 100.0 / proxy_total if proxy_total else None
+
+        lines = [
+            f"桥接   调用 {_fmt(rate('bridge.calls'), '/s')}  出站 {_fmt(rate('bridge.outbound'), '/s')}"
+            f"  队列 {_fmt(gauges.get('bridge.outbound_queue'), digits=0)}",
+            f"       JS调用 p50 {_fmt(pct('bridge.js_call_ms', 'p50'), 'ms')}"
+            f"  p90 {_fmt(pct('bridge.js_call_ms', 'p90'), 'ms')}"
+            f"  页面往返 p50 {_fmt(pct('bridge.page_rtt_ms', 'p50'), 'ms')}",
+            f"HTTP   请求 {_fmt(rate('server.requests'), '/s')}"
+            f"  p90 {_fmt(pct('server.latency_ms', 'p90'), 'ms')}"
+            f"  代理命中 {_fmt(hit_rate, '%', 0)}",
+            f"GUI    延迟 {_fmt(gauges.get('gui.lag_ms'), 'ms', 0)}"
+            f"  p99 {_fmt(pct('gui.lag_ms', 'p99'), 'ms', 0)}"
+            f"  卡顿 {counters.get('gui.stalls', {}).get('total', 0)}",
+            f"计算   排队 {_fmt(gauges.get('compute.queue'), digits=0)}"
+            f"  完成 {counters.get('compute.jobs', {}).get('total', 0)}"
+            f"  p90 {_fmt(pct('compute.job_ms', 'p90'), 'ms', 0)}",
+            f"页面   JS堆 {_fmt(gauges.get(f'page.js_heap_mb[{window_id}]'), 'MB')}"
+            f"  FPS {_fmt(gauges.get(f'page.fps[{window_id}]'), digits=0)}",
+        ]
+        return "\n".join(lines)
+
+    def export_snapshot(self) -> Path:
+        """导出指标快照到日志目录，附带生效的性能配置"""
+        profile = PerformanceProfile.active()
+        path = Logger.get_log_dir() / METRICS_DIR_NAME / f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        metrics.registry.export(path, extra={
+            "window": self.host.window_id,
+            "profile": {"preset": profile.preset, "values": profile.values},
+        })
+        info(f"指标快照已导出 | 路径: {path}")
+        return path
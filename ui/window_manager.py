@@ -0,0 +1,285 @@
+import os
+from collections import deque
+from functools import partial
+from typing import Deque, Dict, List, Optional
+from PyQt6.QtWidgets import QMessageBox, QApplication
+from PyQt6.QtCore import QObject, QUrl, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from config.settings import AppConfig
+from config.profile import PerformanceProfile
+from core.bridge import BridgeHub
+from core.download_manager import DownloadManager
+from core.compute_service import ComputeService
+from core.server import HTTPServerManager, AppHTTPHandler
+from core.proxy_cache import CachingProxy
+from ui.main_window import WebBrowserWindow
+from utils.resource_manager import ResourceManager
+from utils.port_manager import PortManager
+from utils.memory import get_process_rss, get_total_rss, format_bytes
+from utils.stall_detector import StallDetector
+from utils import metrics
+from utils.logger import info, error, debug, warning
+
+try:
+    from core.dataset import DatasetEngine
+except ImportError:  # NumPy为可选依赖，缺失时数据集功能不可用
+    DatasetEngine = None
+
+class WindowManager(QObject):
+    """窗口管理器，所有窗口共享同一个HTTP服务器、WebEngine配置和桥接中心"""
+
+    # 信号定义
+    server_started = pyqtSignal(int)
+    server_failed = pyqtSignal(str, dict)
+
+    # 窗口加载完成后延迟测量内存，等待渲染进程稳定（异步测量，不推迟其他窗口的加载）
+    MEMORY_SETTLE_MS = 1000
+    # 预热页面加载完成后保留的时间，等待低优先级的预取请求完成
+    WARMUP_LINGER_MS = 3000
+
+    def __init__(self, splash=None, parent: QObject = None):
+        super().__init__(parent)
+        self.splash = splash
+        self.windows: Dict[str, WebBrowserWindow] = {}
+        self.server_manager: Optional[HTTPServerManager] = None
+        self.port: Optional[int] = None
+        self.window_counter = 0
+        self.memory_costs: Dict[str, int] = {}  # 窗口ID -> 新增常驻内存
+        self.load_queue: Deque[str] = deque()  # 服务器就绪前创建、等待加载的窗口
+        # 窗口ID -> [加载前的常驻内存, 测量期间是否有其他窗口加载或关闭]
+        self.measurements: Dict[str, List] = {}
+        self.warmup_page: Optional[QWebEnginePage] = None
+
+        # 共享的WebEngine配置：HTTP缓存与渲染进程池由所有窗口共用
+        self.web_profile = QWebEngineProfile(AppConfig.WEB_PROFILE_NAME, self)
+        cache_mb = PerformanceProfile.active().get("http_cache_mb")
+        self.web_profile.setHttpCacheMaximumSize(cache_mb * 1024 * 1024)
+
+        # 共享的桥接中心
+        self.hub = BridgeHub(self)
+        metrics.gauge("bridge.outbound_queue", self.hub.pending_outbound)
+
+        # 共享的下载管理器，同时接管页面触发的下载
+        profile = PerformanceProfile.active()
+        self.downloads = DownloadManager(
+            profile.get("download_dir") or ResourceManager.get_download_dir(),
+            max_concurrent=profile.get("download_max_concurrent"),
+            progress_hz=profile.get("download_progress_hz"),
+            parent=self
+        )
+        self.downloads.attach_profile(self.web_profile)
+        self.hub.attach_downloads(self.downloads)
+
+        # 共享的数据集引擎，Python侧生产者追加数据，页面只请求可见窗口
+        self.datasets = None
+        if DatasetEngine is not None:
+            self.datasets = DatasetEngine()
+            self.hub.attach_datasets(self.datasets)
+        else:
+            warning("未安装NumPy，数据集引擎不可用")
+
+        # 共享的计算进程池，首次提交任务时才启动工作进程，CPU密集任务不占用GUI进程
+        self.compute = ComputeService.from_profile(profile, self)
+        self.hub.attach_compute(self.compute)
+
+        # 事件循环卡顿检测，默认启用（性能浮层显示GUI延迟），所有窗口隐藏或冻结时挂起
+        self.stall_detector = StallDetector.from_profile(profile, self)
+        self.stall_detector.set_suspended(True)  # 首个窗口显示后恢复
+        if profile.get("stall_detector_enabled"):
+            self.stall_detector.start()
+
+    def start_server(self) -> bool:
+        """启动共享HTTP服务器"""
+        if self.server_manager:
+            return True
+
+        if self.splash:
+            self.splash.set_status("正在启动服务器...")
+
+        vue_dir = ResourceManager.get_path(AppConfig.VUE_DIST_PATH)
+        if not os.path.exists(vue_dir):
+            QMessageBox.critical(
+                None, "启动错误",
+                f"无法找到Vue项目目录:\n{vue_dir}"
+            )
+            return False
+
+        final_port = PortManager.find_available_port(AppConfig.DEFAULT_PORT)
+        if not final_port:
+            QMessageBox.critical(None, "启动错误", "无法找到可用端口")
+            return False
+
+        profile = PerformanceProfile.active()
+        self.server_manager = HTTPServerManager(
+            final_port, vue_dir,
+            max_workers=profile.get("server_workers"),
+            request_queue=profile.get("server_request_queue"),
+            proxy=CachingProxy.from_profile(profile, ResourceManager.get_cache_dir()),
+            preload_hints=profile.get("preload_hints"),
+            compute=self.compute
+        )
+        self.server_manager.signals.started.connect(self.on_server_started)
+        self.server_manager.signals.failed.connect(self.on_server_failed)
+        self.server_manager.start()
+        return True
+
+    def on_server_started(self, port: int) -> None:
+        """服务器启动成功"""
+        info(f"服务器启动完成 | 端口: {port}")
+        self.port = port
+        if self.splash:
+            self.splash.set_status("正在加载Web页面...")
+        self.load_pending_windows()
+        if PerformanceProfile.active().get("preload_warm_cache"):
+            self.warm_up_cache()
+        self.server_started.emit(port)
+
+    def warm_up_cache(self) -> None:
+        """
+        启动画面显示期间用共享配置加载隐藏的预热页面，
+        把构建清单中的全部资源（含懒加载路由）写入HTTP缓存，之后的窗口和路由切换直接命中缓存
+        """
+        if self.warmup_page is not None:
+            return
+        self.warmup_page = QWebEnginePage(self.web_profile, self)
+        self.warmup_page.loadFinished.connect(self.on_warmup_loaded)
+        self.warmup_page.load(QUrl(f"http://localhost:{self.port}{AppHTTPHandler.WARMUP_PATH}"))
+        debug("缓存预热开始")
+
+    def on_warmup_loaded(self, ok: bool) -> None:
+        """预热页面加载完成后延迟释放"""
+        if not ok:
+            warning("缓存预热页面加载失败，可能缺少构建清单")
+        QTimer.singleShot(self.WARMUP_LINGER_MS, self.release_warmup_page)
+
+    def release_warmup_page(self) -> None:
+        if self.warmup_page is not None:
+            self.warmup_page.deleteLater()
+            self.warmup_page = None
+            debug("缓存预热完成")
+
+    def on_server_failed(self, error_msg: str, details: dict) -> None:
+        """服务器启动失败处理"""
+        error(f"服务器启动失败详情: {details}")
+        QMessageBox.critical(
+            None, "服务器启动失败",
+            f"启动HTTP服务器时发生错误:\n{error_msg}"
+        )
+        self.server_failed.emit(error_msg, details)
+        for window in list(self.windows.values()):
+            window.close()
+
+    def page_url(self, window_id: str) -> QUrl:
+        """生成窗口页面地址，窗口ID通过查询参数传给页面用于消息路由"""
+        return QUrl(
+            f"http://localhost:{self.port}/{AppConfig.HTML_ENTRY}?window={window_id}#/"
+        )
+
+    def create_window(self, window_id: Optional[str] = None) -> WebBrowserWindow:
+        """创建共享资源的新窗口"""
+        if window_id is None:
+            window_id = "main" if not self.windows else f"window-{self.window_counter}"
+        self.window_counter += 1
+
+        window = WebBrowserWindow(self, window_id, splash=self.splash)
+        self.windows[window_id] = window
+        window.lifecycle_governor.visibility_changed.connect(self.update_stall_detector)
+
+        # 窗口层叠排列
+        offset = 30 * (self.window_counter - 1)
+        window.move(window.x() + offset, window.y() + offset)
+
+        self.load_queue.append(window_id)
+        if self.port:
+            self.load_pending_windows()
+        elif not self.start_server():
+            window.close()
+        return window
+
+    def load_pending_windows(self) -> None:
+        """立即加载所有等待中的窗口页面，加载前采样内存基线"""
+        while self.load_queue:
+            window_id = self.load_queue.popleft()
+            window = self.windows.get(window_id)
+            if window is None:
+                continue
+            self._mark_measurements_overlapped()
+            self.measurements[window_id] = [self.total_rss(), bool(self.measurements)]
+            window.load_html()
+
+    def on_window_loaded(self, window_id: str) -> None:
+        """窗口页面加载结束（成功或失败），等待渲染进程稳定后异步测量"""
+        if window_id in self.measurements:
+            QTimer.singleShot(self.MEMORY_SETTLE_MS, partial(self.record_memory_cost, window_id))
+
+    def release_window(self, window_id: str) -> None:
+        """窗口关闭时释放其占用，最后一个窗口关闭时停止共享资源"""
+        self.windows.pop(window_id, None)
+        self.hub.detach(window_id)
+        self.memory_costs.pop(window_id, None)
+        self.measurements.pop(window_id, None)
+        self._mark_measurements_overlapped()
+        self.update_stall_detector()
+
+        if not self.windows:
+            self.shutdown()
+
+    def update_stall_detector(self, *_args) -> None:
+        """所有窗口都隐藏（隐藏后才会冻结或丢弃）时挂起卡顿检测，任一窗口可见时恢复"""
+        visible = any(window.lifecycle_governor.visible for window in self.windows.values())
+        self.stall_detector.set_suspended(not visible)
+
+    def total_rss(self) -> int:
+        """主进程与所有渲染进程的常驻内存总和"""
+        pids = [window.web_view.page().renderProcessPid()
+                for window in self.windows.values() if window.web_view]
+        return get_process_rss() + get_total_rss(pid for pid in pids if pid > 0)
+
+    def _mark_measurements_overlapped(self) -> None:
+        """其他窗口加载或关闭会改变总内存，进行中的测量不能再使用总量差值"""
+        for measurement in self.measurements.values():
+            measurement[1] = True
+
+    def record_memory_cost(self, window_id: str) -> None:
+        """
+        记录窗口带来的常驻内存增量；测量期间没有其他窗口加载或关闭时取总内存差值，
+        否则只统计该窗口的渲染进程（与其他窗口共用渲染进程时偏大）
+        """
+        measurement = self.measurements.pop(window_id, None)
+        window = self.windows.get(window_id)
+        if measurement is None or window is None:
+            return
+        baseline, overlapped = measurement
+        if overlapped:
+            cost = get_process_rss(window.web_view.page().renderProcessPid())
+            method = "渲染进程"
+        else:
+            cost = self.total_rss() - baseline
+            method = "总量差值"
+        self.memory_costs[window_id] = cost
+        kind = "首个窗口" if len(self.memory_costs) == 1 else "额外窗口"
+        info(f"窗口内存开销 | 窗口: {window_id} ({kind}), 增量: {format_bytes(cost)}, 方式: {method}")
+        self.report_memory()
+
+    def report_memory(self) -> None:
+        """输出内存开销报告"""
+        costs = list(self.memory_costs.values())
+        extra = costs[1:]
+        average = sum(extra) / len(extra) if extra else 0
+        info(
+            f"内存报告 | 窗口数: {len(self.windows)}, 总常驻内存: {format_bytes(self.total_rss())}, "
+            f"每个额外窗口平均: {format_bytes(average)}"
+        )
+
+    def shutdown(self) -> None:
+        """停止共享服务器并退出应用"""
+        self.release_warmup_page()
+        self.stall_detector.stop()
+        if self.server_manager:
+            debug("停止HTTP服务器")
+            self.server_manager.stop()
+            self.server_manager = None
+        self.downloads.shutdown()
+        self.compute.shutdown()
+        self.web_profile.clearAllVisitedLinks()
+        QApplication.instance().quit()
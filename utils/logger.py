@@ -18,6 +18,7 @@ class Logger:
             
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
+        self.log_file = Path(log_file).resolve()
         
         # 避免重复添加处理器
         if self.logger.handlers:
@@ -41,6 +42,7 @@ class Logger:
         # 添加处理器
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
+        self.console_handler = console_handler
     
     @classmethod
     def get_logger(cls) -> logging.Logger:
@@ -48,6 +50,22 @@ class Logger:
         if not cls._instance:
             cls()
         return cls._instance.logger
+    
+    @classmethod
+    def get_log_dir(cls) -> Path:
+        """获取日志文件所在目录（卡顿报告等诊断文件也写入此目录）"""
+        if not cls._instance:
+            cls()
+        return cls._instance.log_file.parent
+    
+    @classmethod
+    def set_level(cls, level: str) -> None:
+        """设置控制台日志级别（文件日志始终记录DEBUG）"""
+        if not cls._instance:
+            cls()
+        handler = getattr(cls._instance, "console_handler", None)
+        if handler:
+            handler.setLevel(level.upper())
 
 # 便捷的日志函数
 def debug(message: str, *args, **kwargs) -> None:
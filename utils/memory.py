@@ -0,0 +1,47 @@
+import os
+from typing import Iterable, Optional
+from .logger import debug
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时在Linux上读取/proc
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def get_process_rss(pid: Optional[int] = None) -> int:
+    """
+    获取进程常驻内存大小
+
+    Args:
+        pid: 进程号，默认为当前进程
+
+    Returns:
+        常驻内存字节数，无法获取时返回0
+    """
+    pid = os.getpid() if pid is None else pid
+    if pid <= 0:
+        return 0
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except (psutil.Error, OSError) as e:
+            debug(f"读取进程内存失败 | PID: {pid}, 错误: {str(e)}")
+            return 0
+    try:
+        with open(f"/proc/{pid}/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def get_total_rss(pids: Iterable[int]) -> int:
+    """获取多个进程（去重后）的常驻内存总和"""
+    return sum(get_process_rss(pid) for pid in set(pids))
+
+def format_bytes(size: float) -> str:
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
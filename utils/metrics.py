@@ -0,0 +1,195 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# 计数器速率的统计窗口（秒）
+RATE_WINDOW_S = 5
+# 直方图蓄水池容量
+RESERVOIR_SIZE = 1024
+
+
+class Counter:
+    """单调递增计数器，按秒分桶计算最近窗口内的速率"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0
+        self.buckets = deque(maxlen=RATE_WINDOW_S + 1)  # [秒, 计数]
+        self.lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        second = int(time.monotonic())
+        with self.lock:
+            self.total += amount
+            if self.buckets and self.buckets[-1][0] == second:
+                self.buckets[-1][1] += amount
+            else:
+                self.buckets.append([second, amount])
+
+    def rate(self) -> float:
+        """最近完整窗口内的每秒次数（不含当前未结束的一秒）"""
+        now = int(time.monotonic())
+        with self.lock:
+            count = sum(n for second, n in self.buckets if now - RATE_WINDOW_S <= second < now)
+        return count / RATE_WINDOW_S
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"total": self.total, "rate": self.rate()}
+
+
+class Gauge:
+    """瞬时值，可直接设置，也可在读取时调用回调计算（如队列长度）"""
+
+    def __init__(self, name: str, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.fn = fn
+        self.current: Optional[float] = None
+
+    def set(self, value: float) -> None:
+        self.current = value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return None
+        return self.current
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """蓄水池采样直方图：固定内存下估计分位数，同时精确记录次数、总和与极值"""
+
+    def __init__(self, name: str, size: int = RESERVOIR_SIZE):
+        self.name = name
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.reservoir = []
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self.lock:
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            if len(self.reservoir) < self.size:
+                self.reservoir.append(value)
+            else:
+                # Algorithm R：第n个样本以 size/n 的概率替换随机位置
+                slot = random.randrange(self.count)
+                if slot < self.size:
+                    self.reservoir[slot] = value
+
+    @contextmanager
+    def time(self):
+        """记录代码块耗时（毫秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter() - start) * 1000.0)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.reservoir)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100.0 * len(samples)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """指标注册表：按名称获取或创建指标，各模块直接持有指标对象更新，开销仅为一次加锁"""
+
+    def __init__(self):
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        with self.lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name)
+            return self.counters[name]
+
+    def gauge(self, name: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        """获取仪表，传入回调时替换已有的回调"""
+        with self.lock:
+            if name not in self.gauges:
+                self.gauges[name] = Gauge(name, fn)
+            elif fn is not None:
+                self.gauges[name].fn = fn
+            return self.gauges[name]
+
+    def histogram(self, name: str) -> Histogram:
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(name)
+            return self.histograms[name]
+
+    def remove(self, name: str) -> None:
+        """移除指标（如已关闭窗口的页面指标）"""
+        with self.lock:
+            self.counters.pop(name, None)
+            self.gauges.pop(name, None)
+            self.histograms.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """所有指标的当前值"""
+        with self.lock:
+            counters, gauges, histograms = dict(self.counters), dict(self.gauges), dict(self.histograms)
+        return {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "counters": {name: metric.snapshot() for name, metric in sorted(counters.items())},
+            "gauges": {name: metric.snapshot()["value"] for name, metric in sorted(gauges.items())},
+            "histograms": {name: metric.snapshot() for name, metric in sorted(histograms.items())},
+        }
+
+    def export(self, path: Path, extra: Optional[Dict[str, Any]] = None) -> Path:
+        """导出快照到JSON文件，用于附加到问题报告"""
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# 进程内共享的注册表
+registry = MetricsRegistry()
+
+# 便捷函数
+def counter(name: str) -> Counter:
+    return registry.counter(name)
+
+def gauge(name: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+    return registry.gauge(name, fn)
+
+def histogram(name: str) -> Histogram:
+    return registry.histogram(name)
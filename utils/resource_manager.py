@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from PyQt6.QtGui import QPixmap, QIcon
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QStandardPaths
 from config.settings import AppConfig
 from .logger import info, warning, error
 
@@ -27,6 +27,24 @@ class ResourceManager:
         base_path = ResourceManager.get_base_path()
         return os.path.join(base_path, relative_path)
     
+    @staticmethod
+    def get_cache_dir() -> str:
+        """获取应用缓存目录（不存在时创建）"""
+        cache_dir = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.CacheLocation
+        ) or ResourceManager.get_path("cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+    
+    @staticmethod
+    def get_download_dir() -> str:
+        """获取系统下载目录（不存在时创建）"""
+        download_dir = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.DownloadLocation
+        ) or ResourceManager.get_path("downloads")
+        os.makedirs(download_dir, exist_ok=True)
+        return download_dir
+    
     @staticmethod
     def exists(relative_path: str) -> bool:
         """检查资源是否存在"""
@@ -0,0 +1,231 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from utils import metrics
+from utils.logger import Logger, info, warning, debug
+
+# 卡顿报告目录（位于日志目录下）
+STALL_DIR_NAME = "stalls"
+
+
+class _Stall:
+    """一次进行中的卡顿：起始时间与采样到的折叠调用栈计数"""
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+
+class StallDetector(QObject):
+    """
+    事件循环卡顿检测器：GUI线程的心跳定时器记录最近一次心跳时间，
+    看门狗线程发现心跳停滞超过阈值后按固定频率采样所有线程的Python调用栈，
+    卡顿结束时把折叠调用栈（flamegraph.pl / speedscope 可直接读取）写入日志目录。
+    所有窗口隐藏或冻结时挂起：心跳停止，看门狗阻塞在条件变量上直到恢复
+    """
+
+    # 信号定义（由看门狗线程发出，跨线程排队投递）
+    stall_detected = pyqtSignal(float, str)  # 卡顿时长(ms), 报告路径
+
+    def __init__(self, threshold_ms: int = 200, heartbeat_ms: int = 100, sample_hz: float = 100.0,
+                 max_reports: int = 50, stall_dir: Optional[Path] = None, parent: QObject = None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.heartbeat_interval = heartbeat_ms / 1000.0
+        self.sample_interval = 1.0 / sample_hz if sample_hz > 0 else 0.01
+        self.max_reports = max_reports
+        self.stall_dir = stall_dir or Logger.get_log_dir() / STALL_DIR_NAME
+
+        self.last_beat = time.monotonic()
+        self.last_lag_ms = 0.0  # 最近一次心跳的事件循环延迟
+        self.max_lag_ms = 0.0  # 启用以来的最大延迟
+        self.stall_count = 0
+        self.gui_thread_id: Optional[int] = None
+        self.current: Optional[_Stall] = None
+
+        self.lag_histogram = metrics.histogram("gui.lag_ms")
+        self.stall_counter = metrics.counter("gui.stalls")
+        metrics.gauge("gui.lag_ms", lambda: self.last_lag_ms if self.enabled else None)
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(heartbeat_ms)
+        self.heartbeat.timeout.connect(self._beat)
+        self.watchdog: Optional[threading.Thread] = None
+        # 看门狗等待的条件变量：心跳在卡顿期间恢复、挂起/恢复和停止时通知
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.suspended = False
+
+    @classmethod
+    def from_profile(cls, profile, parent: QObject = None) -> "StallDetector":
+        """根据性能配置创建检测器"""
+        return cls(
+            threshold_ms=profile.get("stall_threshold_ms"),
+            heartbeat_ms=profile.get("stall_heartbeat_ms"),
+            sample_hz=profile.get("stall_sample_hz"),
+            max_reports=profile.get("stall_max_reports"),
+            parent=parent
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.watchdog is not None
+
+    def start(self) -> None:
+        """启动检测，必须在GUI线程调用"""
+        if self.enabled:
+            return
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.current = None
+        self.stopping = False
+        if not self.suspended:
+            self.heartbeat.start()
+        self.watchdog = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self.watchdog.start()
+        info(f"卡顿检测已启用 | 阈值: {self.threshold * 1000:.0f}ms, 采样频率: {1 / self.sample_interval:.0f}Hz")
+
+    def stop(self) -> None:
+        """停止检测"""
+        if not self.enabled:
+            return
+        self.heartbeat.stop()
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.watchdog.join(1.0)
+        self.watchdog = None
+        info("卡顿检测已停用")
+
+    def toggle(self) -> bool:
+        """运行时切换启用状态，返回切换后的状态"""
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
+        return self.enabled
+
+    def set_suspended(self, suspended: bool) -> None:
+        """挂起或恢复检测（所有窗口隐藏或冻结时挂起），必须在GUI线程调用"""
+        if suspended == self.suspended:
+            return
+        if suspended:
+            self.heartbeat.stop()
+            # 调用本身说明事件循环在运行，刷新心跳让进行中的卡顿正常结束
+            self.last_beat = time.monotonic()
+        else:
+            self.last_beat = time.monotonic()
+            if self.enabled:
+                self.heartbeat.start()
+        with self.condition:
+            self.suspended = suspended
+            self.condition.notify()
+        debug(f"卡顿检测{'已挂起' if suspended else '已恢复'}")
+
+    def _beat(self) -> None:
+        """GUI线程心跳：记录时间与相对预期间隔的延迟"""
+        now = time.monotonic()
+        lag = max(0.0, now - self.last_beat - self.heartbeat_interval) * 1000.0
+        self.last_lag_ms = lag
+        self.lag_histogram.observe(lag)
+        self.max_lag_ms = max(self.max_lag_ms, lag)
+        self.last_beat = now
+        if self.current is not None:
+            # 卡顿期间的首个心跳立即唤醒看门狗结束卡顿，平时不唤醒
+            with self.condition:
+                self.condition.notify()
+
+    def _watch(self) -> None:
+        """
+        看门狗线程：空闲时阻塞到最近一次心跳加阈值的截止时间，卡顿期间按采样频率抓取调用栈，
+        挂起期间一直阻塞到恢复或停止
+        """
+        stall_after = self.heartbeat_interval + self.threshold
+        while True:
+            with self.condition:
+                if self.current is None:
+                    self.condition.wait_for(lambda: self.stopping or not self.suspended)
+                if self.stopping:
+                    return
+                last_beat = self.last_beat
+                suspended = self.suspended
+            overdue = time.monotonic() - last_beat - stall_after
+            if overdue > 0 and not suspended:
+                if self.current is None:
+                    self.current = _Stall(last_beat)
+                self._sample(self.current)
+                timeout = self.sample_interval
+            else:
+                if self.current is not None:
+                    stall, self.current = self.current, None
+                    self._finish(stall, last_beat)
+                timeout = max(0.0, -overdue)
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.stopping or self.suspended != suspended or self.last_beat != last_beat,
+                    timeout
+                )
+
+    def _sample(self, stall: _Stall) -> None:
+        """采样所有线程（看门狗自身除外）的调用栈并折叠计数"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            label = names.get(thread_id, str(thread_id))
+            if thread_id == self.gui_thread_id:
+                label = f"{label} [GUI]"
+            stall.stacks[";".join([label] + frames[::-1])] += 1
+        stall.samples += 1
+
+    def _finish(self, stall: _Stall, resumed_at: float) -> None:
+        """卡顿结束：写出折叠调用栈报告"""
+        duration_ms = max(0.0, resumed_at - stall.started_at - self.heartbeat_interval) * 1000.0
+        self.stall_count += 1
+        self.stall_counter.inc()
+        path = ""
+        if stall.samples:
+            try:
+                path = str(self._write_report(stall, duration_ms))
+            except OSError as e:
+                warning(f"卡顿报告写入失败: {str(e)}")
+        warning(f"检测到事件循环卡顿 | 时长: {duration_ms:.0f}ms, 采样: {stall.samples}, "
+                f"GUI线程: {self._gui_hotspot(stall)}, 报告: {path or '无'}")
+        self.stall_detected.emit(duration_ms, path)
+
+    def _gui_hotspot(self, stall: _Stall) -> str:
+        """GUI线程采样最多的栈顶帧"""
+        top = Counter()
+        for stack, count in stall.stacks.items():
+            if stack.split(";", 1)[0].endswith("[GUI]"):
+                top[stack.rsplit(";", 1)[-1]] += count
+        return top.most_common(1)[0][0] if top else "未知"
+
+    def _write_report(self, stall: _Stall, duration_ms: float) -> Path:
+        self.stall_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.stall_dir / f"stall-{stamp}-{duration_ms:.0f}ms.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stall.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._prune_reports()
+        debug(f"卡顿报告已写入 | 路径: {path}")
+        return path
+
+    def _prune_reports(self) -> None:
+        """只保留最近的若干份报告"""
+        reports = sorted(self.stall_dir.glob("stall-*.folded"), key=lambda p: p.stat().st_mtime)
+        for old in reports[:-self.max_reports] if self.max_reports > 0 else []:
+            old.unlink()
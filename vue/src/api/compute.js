@@ -0,0 +1,74 @@
+// 计算接口：CPU密集任务在Python进程池中执行，大数组结果经内嵌服务器以二进制返回
+
+const TYPED_ARRAYS = {
+  float64: Float64Array,
+  float32: Float32Array,
+  int64: BigInt64Array,
+  int32: Int32Array,
+  int16: Int16Array,
+  int8: Int8Array,
+  uint64: BigUint64Array,
+  uint32: Uint32Array,
+  uint16: Uint16Array,
+  uint8: Uint8Array,
+  bool: Uint8Array,
+};
+
+const getBridge = () => {
+  if (!window.bridge || !window.bridge.submitCompute) {
+    throw new Error('Qt计算接口不可用');
+  }
+  return window.bridge;
+};
+
+// 二进制结果只能取一次，取回后转为对应的TypedArray
+const fetchBinary = async ({ url, dtype, shape }) => {
+  const response = await fetch(url, { cache: 'no-store' });
+  if (!response.ok) {
+    throw new Error(`计算结果获取失败: ${response.status}`);
+  }
+  const TypedArray = TYPED_ARRAYS[dtype] || Uint8Array;
+  return { data: new TypedArray(await response.arrayBuffer()), dtype, shape };
+};
+
+// 等待指定任务的完成或失败信号
+const waitForJob = (bridge, jobId) => new Promise((resolve, reject) => {
+  const onFinished = (id, payload) => {
+    if (id !== jobId) {
+      return;
+    }
+    cleanup();
+    const result = JSON.parse(payload);
+    result.binary ? fetchBinary(result.binary).then(resolve, reject) : resolve(result.value);
+  };
+  const onFailed = (id, message) => {
+    if (id === jobId) {
+      cleanup();
+      reject(new Error(message));
+    }
+  };
+  const cleanup = () => {
+    bridge.computeFinished.disconnect(onFinished);
+    bridge.computeFailed.disconnect(onFailed);
+  };
+  bridge.computeFinished.connect(onFinished);
+  bridge.computeFailed.connect(onFailed);
+});
+
+// 提交任务：options为 { args, kwargs, priority, memory_mb }，返回 { jobId, result }
+const runCompute = async (task, options = {}) => {
+  const bridge = getBridge();
+  const jobId = await bridge.submitCompute(task, JSON.stringify(options));
+  if (!jobId) {
+    throw new Error(`计算任务提交失败: ${task}`);
+  }
+  return { jobId, result: waitForJob(bridge, jobId) };
+};
+
+// 取消任务，result 以“任务已取消”拒绝
+const cancelCompute = (jobId) => getBridge().cancelCompute(jobId);
+
+export {
+  runCompute,
+  cancelCompute,
+}
@@ -0,0 +1,49 @@
+// 数据集接口：数据保存在Python侧的列式表中，页面只请求可见的行窗口
+
+const getBridge = () => {
+  if (!window.bridge || !window.bridge.datasetQuery) {
+    throw new Error('Qt数据集接口不可用');
+  }
+  return window.bridge;
+};
+
+const callDataset = async (method, request) => {
+  const response = JSON.parse(await getBridge()[method](JSON.stringify(request)));
+  if (response.error) {
+    throw new Error(response.error);
+  }
+  return response;
+};
+
+// 查询行窗口：{ table, offset, length, sort_by, descending, filters, columns }
+const queryWindow = (request) => callDataset('datasetQuery', request);
+
+// 聚合计算：{ table, column, functions, filters, group_by }
+const aggregate = (request) => callDataset('datasetAggregate', request);
+
+// 表结构与行数
+const getSchema = async (table) => {
+  const response = JSON.parse(await getBridge().datasetSchema(table));
+  if (response.error) {
+    throw new Error(response.error);
+  }
+  return response;
+};
+
+// 监听数据变化，返回取消监听的函数
+const onDatasetChanged = (table, callback) => {
+  const handler = (name, rows) => {
+    if (name === table) {
+      callback(rows);
+    }
+  };
+  getBridge().datasetChanged.connect(handler);
+  return () => getBridge().datasetChanged.disconnect(handler);
+};
+
+export {
+  queryWindow,
+  aggregate,
+  getSchema,
+  onDatasetChanged,
+}
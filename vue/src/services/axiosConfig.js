@@ -63,6 +63,58 @@ const saveFile = (blob, filename) => {
   document.body.removeChild(link);
 };
 
+// 通过Qt下载管理器流式下载到磁盘，页面不持有文件内容
+const downloadViaQt = (bridge, url, data, onDownloadProgress, setProgress, filename) =>
+  new Promise((resolve, reject) => {
+    let taskId = null;
+    const onProgress = (id, loaded, total) => {
+      if (id !== taskId) return;
+      if (total > 0) {
+        setProgress(Math.round((loaded * 100) / total));
+      }
+      if (onDownloadProgress) {
+        onDownloadProgress({ loaded, total, lengthComputable: total > 0 });
+      }
+    };
+    const cleanup = () => {
+      bridge.downloadProgress.disconnect(onProgress);
+      bridge.downloadFinished.disconnect(onFinished);
+      bridge.downloadFailed.disconnect(onFailed);
+    };
+    const onFinished = (id, path) => {
+      if (id !== taskId) return;
+      cleanup();
+      resolve(path);
+    };
+    const onFailed = (id, message) => {
+      if (id !== taskId) return;
+      cleanup();
+      reject(new Error(message));
+    };
+    bridge.downloadProgress.connect(onProgress);
+    bridge.downloadFinished.connect(onFinished);
+    bridge.downloadFailed.connect(onFailed);
+
+    const absoluteUrl = new URL(url, window.location.href).href;
+    const options = {
+      method: 'POST',
+      body: data === undefined ? null : JSON.stringify(data),
+      headers: { 'Content-Type': 'application/json' },
+      filename,
+    };
+    Promise.resolve(bridge.startDownload(absoluteUrl, JSON.stringify(options)))
+      .then((id) => {
+        taskId = id;
+        if (!taskId) {
+          throw new Error('Qt下载管理器不可用');
+        }
+      })
+      .catch((error) => {
+        cleanup();
+        reject(error);
+      });
+  });
+
 // 下载文件
 export const downloadFile = async (
   url,
@@ -75,6 +127,19 @@ export const downloadFile = async (
   try {
     setProgressStatus('default');
     setProgress(0);
+    // 在Qt中运行时交给Python流式写盘，避免大文件整体驻留在渲染进程内存中
+    if (window.bridge && window.bridge.startDownload) {
+      await downloadViaQt(
+        window.bridge,
+        process.env.APP_BASE_URL + url,
+        data,
+        onDownloadProgress,
+        setProgress,
+        filename
+      );
+      setProgressStatus('success');
+      return;
+    }
     const response = await axios({
       method: 'POST',
       url: process.env.APP_BASE_URL + url,
@@ -0,0 +1,57 @@
+// 页面性能上报：Qt打开性能浮层后，每秒上报JS堆、帧率和上一次上报的桥接往返耗时
+
+const REPORT_INTERVAL_MS = 1000;
+
+// 开关信号来自本窗口专属的 windowBridge，指标经共享的 bridge 上报
+export const startPerfReporter = (bridge, windowBridge, windowId) => {
+  if (!bridge || !bridge.reportPageMetrics || !windowBridge || !windowBridge.metricsRequested) {
+    return;
+  }
+
+  let timer = null;
+  let rafId = null;
+  let frames = 0;
+  let windowStart = 0;
+  let lastRtt = null;
+
+  const countFrame = () => {
+    frames++;
+    rafId = requestAnimationFrame(countFrame);
+  };
+
+  const report = () => {
+    const now = performance.now();
+    const fps = (frames * 1000) / (now - windowStart);
+    frames = 0;
+    windowStart = now;
+    // performance.memory 为Chromium专有接口
+    const heap = performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null;
+    const payload = JSON.stringify({ jsHeapMb: heap, fps, rttMs: lastRtt });
+    const sentAt = performance.now();
+    bridge.reportPageMetrics(windowId, payload, () => {
+      lastRtt = performance.now() - sentAt;
+    });
+  };
+
+  const start = () => {
+    if (timer) {
+      return;
+    }
+    frames = 0;
+    windowStart = performance.now();
+    rafId = requestAnimationFrame(countFrame);
+    timer = setInterval(report, REPORT_INTERVAL_MS);
+  };
+
+  const stop = () => {
+    clearInterval(timer);
+    cancelAnimationFrame(rafId);
+    timer = null;
+    rafId = null;
+    lastRtt = null;
+  };
+
+  windowBridge.metricsRequested.connect((enabled) => {
+    enabled ? start() : stop();
+  });
+};
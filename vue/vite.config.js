@@ -40,6 +40,10 @@ export default defineConfig(({ mode }) => {
       }),
     ],
     base: env.VITE_BASE || './',
+    build: {
+      // 输出 dist/.vite/manifest.json，供内嵌服务器生成关键资源的预加载提示
+      manifest: true,
+    },
     resolve: {
       alias: {
         '@': path.resolve(__dirname, './src'),